@@ -0,0 +1,190 @@
+
+import argparse
+import json
+import platform
+import time
+import timeit
+import numpy as np
+from typing import Callable, NamedTuple
+
+
+class Case(NamedTuple):
+    '''
+    One benchmarked call.
+
+    name   (str): Function being timed
+    n_bits (int): Register size
+    shift  (int): Shift (or m for the multiplications), None if not used
+    call   (Callable[[], object]): Runs the function once
+    batch  (int): Number of values computed by one call
+    '''
+    name:   str
+    n_bits: int
+    shift:  int
+    call:   Callable[[], object]
+    batch:  int = 1
+
+
+def primitiveCases(n_bits: int, shift: int, rng) -> list[Case]:
+    '''
+    Cases for the register primitives with one (n_bits, shift) pair. The 
+    multiplications use m = shift and are skipped for shift 0, since m must
+    be at least one.
+    '''
+    from ModuloBitShift import bitshift
+    from ShiftAdd import add
+    import Mult
+    import multSimplified
+
+    N      = 1<<n_bits
+    x, y   = (int(v) for v in rng.integers(0, N, size=2))
+    m      = shift
+
+    cases = [
+        Case("ModuloBitShift.bitshift", n_bits, shift,
+             lambda: bitshift(x, shift, n_bits)),
+        Case("ShiftAdd.add", n_bits, shift,
+             lambda: add(x, y, shift, n_bits)),
+    ]
+    if m == 0:
+        return cases
+
+    return cases + [
+        Case("Mult.mult", n_bits, m,
+             lambda: Mult.mult(x, 0, n_bits, m, modulo=True)),
+        Case("Mult.multImproved", n_bits, m,
+             lambda: Mult.multImproved(x, 0, 0, n_bits, m, modulo=True)),
+        Case("multSimplified.mult", n_bits, m,
+             lambda: multSimplified.mult(x, 0, n_bits, m)),
+    ]
+
+
+def arcsinCases(n_bits: int, rng, batch: int = 1024) -> list[Case]:
+    '''
+    Cases for every arcsin CORDIC variant with one bit width.
+    '''
+    import ClassicalQCORDIC
+    import FullPrototypeClassical
+
+    t      = int(rng.integers(-(1<<n_bits), (1<<n_bits)+1))
+    tBatch = rng.integers(-(1<<n_bits), (1<<n_bits)+1, size=batch)
+    scalar = [
+        ClassicalQCORDIC.asinCORDICCheating,
+        ClassicalQCORDIC.asinCORDICClassical,
+        ClassicalQCORDIC.qasinCORDIC,
+        ClassicalQCORDIC.qasinModuloCORDIC,
+        FullPrototypeClassical.qasinModuloCORDIC,
+    ]
+    cases = [
+        Case(f"{f.__module__}.{f.__name__}", n_bits, None,
+             lambda f=f: f(t, n_bits))
+        for f in scalar
+    ]
+    cases.append(Case(
+        "FullPrototypeClassical.qasinModuloCORDICBatch", n_bits, None,
+        lambda: FullPrototypeClassical.qasinModuloCORDICBatch(tBatch, n_bits),
+        batch
+    ))
+
+    return cases
+
+
+def timeCase(case: Case, minTime: float = 0.2) -> dict:
+    '''
+    Times a case, running it for at least minTime seconds.
+
+    case   (Case): Case to time
+    minTime (float): Minimum total time spent running the case
+
+    return (dict): The case description with calls, seconds, ops_per_sec 
+        (values computed per second) and latency_us (microseconds per call)
+    '''
+    timer   = timeit.Timer(case.call)
+    calls   = 1
+    seconds = timer.timeit(calls)
+    while seconds < minTime:
+        calls   = max(2*calls, int(calls*1.2*minTime/max(seconds, 1e-9)))
+        seconds = timer.timeit(calls)
+
+    return {
+        "name":        case.name,
+        "n_bits":      case.n_bits,
+        "shift":       case.shift,
+        "batch":       case.batch,
+        "calls":       calls,
+        "seconds":     seconds,
+        "ops_per_sec": calls*case.batch/seconds,
+        "latency_us":  1e6*seconds/calls,
+    }
+
+
+def runBenchmarks(
+        nBits: list[int], shifts: list[int], minTime: float = 0.2,
+        select: str = "", seed: int = 0,
+    ) -> dict:
+    '''
+    Runs every case on a grid of bit widths and shifts.
+
+    nBits  (list[int]): Register sizes
+    shifts (list[int]): Shifts for the primitives, ones not below n_bits 
+        are skipped
+    minTime   (float): Minimum time spent on each case
+    select      (str): Only run cases whose name contains this
+    seed        (int): Seed of the random inputs
+
+    return (dict): Run metadata and the list of results
+    '''
+    rng   = np.random.default_rng(seed)
+    cases = []
+    for n_bits in nBits:
+        for shift in shifts:
+            if shift < n_bits:
+                cases.extend(primitiveCases(n_bits, shift, rng))
+        cases.extend(arcsinCases(n_bits, rng))
+
+    results = [
+        timeCase(case, minTime) for case in cases if select in case.name
+    ]
+
+    return {
+        "meta": {
+            "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python":   platform.python_version(),
+            "numpy":    np.__version__,
+            "machine":  platform.machine(),
+            "platform": platform.platform(),
+            "seed":     seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Times the shift-add primitives and CORDIC variants"
+    )
+    parser.add_argument("--n-bits", type=int, nargs="+", default=[8, 12, 16])
+    parser.add_argument("--shifts", type=int, nargs="+", default=[0, 1, 4])
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--select", default="",
+                        help="only run cases whose name contains this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    report = runBenchmarks(
+        args.n_bits, args.shifts, args.min_time, args.select, args.seed
+    )
+    for r in report["results"]:
+        print(
+            f"{r['name']:<46} n_bits={r['n_bits']:>3} shift={str(r['shift']):>4}"
+            +f" | {r['ops_per_sec']:>12.1f} ops/s | {r['latency_us']:>10.2f} us"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
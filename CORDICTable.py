@@ -0,0 +1,118 @@
+
+import os
+import numpy as np
+from functools import cache
+
+from Variants import evaluate
+
+TABLE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")
+MAX_BITS:  int = 20
+
+
+def tablePath(n_bits: int, variant: str = "modulo", directory: str = TABLE_DIR) -> str:
+    '''
+    Location of the lookup table for a given bit width and variant.
+
+    n_bits    (int): Number of bits used to describe t
+    variant   (str): Key into Variants.VARIANTS
+    directory (str): Folder holding the tables
+
+    return (str): Path of the .npy file
+    '''
+    return os.path.join(directory, f"qasin_{variant}_{n_bits}.npy")
+
+
+def buildTable(
+        n_bits: int, variant: str = "modulo", directory: str = TABLE_DIR,
+        chunk: int = 1<<16, overwrite: bool = False,
+    ) -> str:
+    '''
+    Evaluates the emulator once for every input in [-(1<<n_bits), 1<<n_bits]
+    and writes the results to a .npy file. Index i holds the result for
+    t = i-(1<<n_bits). The file is filled chunk by chunk through a memmap,
+    so memory use stays small.
+
+    n_bits     (int): Number of bits used to describe t, at most MAX_BITS
+    variant    (str): Key into Variants.VARIANTS
+    directory  (str): Folder holding the tables
+    chunk      (int): Number of inputs evaluated at once
+    overwrite (bool): Rebuilds the table even if the file already exists
+
+    return (str): Path of the .npy file
+    '''
+    if n_bits > MAX_BITS:
+        raise ValueError(f"{n_bits=} is too large to tabulate ({MAX_BITS=})")
+
+    path = tablePath(n_bits, variant, directory)
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    size    = (2<<n_bits)+1
+    partial = path + ".partial"
+    table   = np.lib.format.open_memmap(
+        partial, mode="w+", dtype=np.float64, shape=(size,)
+    )
+    for start in range(0, size, chunk):
+        stop = min(start+chunk, size)
+        table[start:stop] = evaluate(
+            np.arange(start, stop, dtype=np.int64)-(1<<n_bits), n_bits, variant
+        )
+    table.flush()
+    del table
+    os.replace(partial, path)
+    loadTable.cache_clear()
+
+    return path
+
+
+@cache
+def loadTable(
+        n_bits: int, variant: str = "modulo", directory: str = TABLE_DIR
+    ) -> np.ndarray:
+    '''
+    Maps a lookup table read only, building it first if it does not exist.
+
+    n_bits    (int): Number of bits used to describe t
+    variant   (str): Key into Variants.VARIANTS
+    directory (str): Folder holding the tables
+
+    return (np.ndarray): Memory mapped table, see buildTable for the layout
+    '''
+    path = buildTable(n_bits, variant, directory)
+    return np.load(path, mmap_mode="r")
+
+
+def lookup(
+        t: np.ndarray, n_bits: int, variant: str = "modulo", 
+        directory: str = TABLE_DIR,
+    ) -> np.ndarray:
+    '''
+    Table driven arcsin CORDIC, gives the same values as the emulator without
+    recomputing them.
+
+    t  (np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles in fixed point 
+        notation
+    n_bits    (int): Number of bits used to describe t
+    variant   (str): Key into Variants.VARIANTS
+    directory (str): Folder holding the tables
+
+    return (np.ndarray): Approximations of arcsin(t/(2^n_bits))
+    '''
+    t = np.asarray(t, dtype=np.int64)
+    if np.any(np.abs(t) > (1<<n_bits)):
+        raise ValueError(f"Inputs must lie in [-(1<<{n_bits}), 1<<{n_bits}]")
+
+    return np.asarray(loadTable(n_bits, variant, directory)[t+(1<<n_bits)])
+
+
+def main():
+    n_bits = 12
+    test   = np.arange(-(1<<n_bits), (1<<n_bits)+1)
+
+    print(f"Table: {buildTable(n_bits)}")
+    print(f"{np.array_equal(lookup(test, n_bits), evaluate(test, n_bits)) = }")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 
 import numpy as np
-import plotext as plt
 
 from Mult import multImproved as mult
 from ShiftAdd import add
+from Schedule import arctanTable
+from Trace import TraceHook, printTrace
 
 
 def isneg(value: int, n_bits: int, modulo: bool = False) -> bool:
@@ -14,21 +15,19 @@ def isneg(value: int, n_bits: int, modulo: bool = False) -> bool:
         return (value & (1<<(n_bits-1))) != 0
     return value < 0
 
-def asinCORDICCheating(t:int, n_bits:int, debug:bool=False):
+def asinCORDICCheating(
+        t:int, n_bits:int, debug:bool=False, trace: TraceHook = None
+    ):
     theta_i:    float = 0
     x_i:        float = 2**n_bits
     y_i:        float = 0
     t_i:        float = t
     d:      list[int] = [0]
 
-    supertempTheta = np.arcsin(t/(1<<n_bits))
-    tempX = []; tempY = []; tempT = []; tempTheta = []
+    if debug and trace is None:
+        trace = printTrace(t, n_bits)
 
     for i in range(1, n_bits+2):
-        tempX.append(x_i); tempY.append(y_i); 
-        tempT.append(t_i); tempTheta.append((2**n_bits)*theta_i)
-        
-
         # if x_i>=0:
         #     d.append(1 if y_i <= t_i else -1)
         # else:
@@ -37,12 +36,8 @@ def asinCORDICCheating(t:int, n_bits:int, debug:bool=False):
             np.sign(x_i)*np.sign(t_i - (y_i if x_i>0 else 0))
         )
 
-        if debug:
-            print(f"|x{i-1}={x_i:.2f}\t|y{i-1}={y_i:.2f}"
-                  +f"\t|t{i-1}={t_i:.2f}\t|theta{i-1}={theta_i:.2f}"
-                  +f"\t|d{i}={d[i]}"
-                  +f"\t|truD{i}={int(1 if theta_i <= supertempTheta else -1)}"
-            )
+        if trace is not None:
+            trace(i, x_i, y_i, t_i, 0, 0, theta_i, d[i])
         
         for _ in range(2):
         # for _ in range(1): #temp
@@ -57,15 +52,36 @@ def asinCORDICCheating(t:int, n_bits:int, debug:bool=False):
         t_i     *= (1+2**(-2*i))
         # t_i = t_i #temp
 
-    # plt.scatter(tempX, label="x", marker='hd')
-    # plt.scatter(tempY, label="y", marker="hd")
-    # plt.scatter(tempT, label="t", marker="hd")
-    # # plt.scatter([(1<<(n_bits-1)) if s else 0 for s in d], label="d", marker="hd")
-    # print(tempTheta)
-    # # plt.plot([1.4437728 for _ in tempTheta], label="correct", marker="hd")
-    # plt.scatter(tempTheta, label="theta", marker="hd")
-    # plt.title("Classical")
-    # plt.show()
+    return theta_i
+
+
+def asinCORDICCheatingBatch(t: np.ndarray, n_bits: int) -> np.ndarray:
+    '''
+    Vectorized version of asinCORDICCheating over an array of inputs, in 
+    float64 with the same decision rule, double rotation and t_i scaling. 
+    Results match asinCORDICCheating bit for bit.
+
+    t (np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles
+    n_bits (int): Number of bits used to describe t
+
+    return (np.ndarray): theta_{n_bits+2} for every input
+    '''
+    t_i     = np.array(t, dtype=np.float64)
+    theta_i = np.zeros_like(t_i)
+    x_i     = np.full_like(t_i, 2**n_bits)
+    y_i     = np.zeros_like(t_i)
+
+    for i in range(1, n_bits+2):
+        d = np.sign(x_i)*np.sign(t_i - np.where(x_i>0, y_i, 0))
+
+        for _ in range(2):
+            x_i, y_i = (
+                x_i - d*(y_i/(2**i)),
+                y_i + d*(x_i/(2**i)),
+            )
+
+        theta_i += 2*d*np.arctan(2**(-i))
+        t_i     *= (1+2**(-2*i))
 
     return theta_i
 
@@ -147,11 +163,15 @@ def qasinCORDIC(t, n_bits):
     return theta_i
 
 
-def qasinModuloCORDIC(t: int, n_bits: int, debug: bool = False):
+def qasinModuloCORDIC(
+        t: int, n_bits: int, debug: bool = False, trace: TraceHook = None
+    ):
     """
     Unitary version of double rotation CORDIC algorithm (TODO: cite the paper)
     t (int) [0,1]: input angle written in fixed point notation
     n_bits (int): number of bits used to describe t
+    debug (bool): prints every iteration
+    trace (TraceHook): called every iteration, see Trace.py
     """
     n:          int = n_bits+2
     theta_i:    int = 0
@@ -161,18 +181,14 @@ def qasinModuloCORDIC(t: int, n_bits: int, debug: bool = False):
     aux_1:      int = 0
     aux_2:      int = 0
     d:   list[bool] = [False] #Note, first index not used
+    atan            = arctanTable(n)
 
-    supertempTheta = np.arcsin(t/(1<<n_bits))
-    tempX = []; tempY = []; tempT = []; tempTheta = []
+    if debug and trace is None:
+        trace = printTrace(t, n_bits)
 
     for i in range(1, n):
-        tempX.append(x_i); tempY.append(y_i); 
-        tempT.append(t_i); tempTheta.append((2**n_bits)*theta_i)
-        # tempX.append(x_i); tempY.append(y_i)
         # d.append(not(isneg(x_i, n, modulo=True) != (y_i < t_i)))
 
-        # d.append(theta_i >= supertempTheta)
-
         d.append(
             isneg(x_i, n, True) 
             != (isneg(t_i - (0 if isneg(x_i, n, True) else y_i), n, True))
@@ -187,12 +203,8 @@ def qasinModuloCORDIC(t: int, n_bits: int, debug: bool = False):
         #         )
         # )
 
-        if debug:
-            print(f"|x{i-1}={x_i:.2f}\t|y{i-1}={y_i:.2f}"
-                  +f"\t|t{i-1}={t_i:.2f}\t|theta{i-1}={theta_i:.2f}"
-                  +f"\t|d{i}={d[i]}"
-                  +f"\t|truD{i}={int(1 if theta_i <= supertempTheta else -1)}"
-            )
+        if trace is not None:
+            trace(i, x_i, y_i, t_i, aux_1, aux_2, theta_i, d[i])
 
         if d[i]:
             x_i, y_i = y_i, x_i
@@ -206,20 +218,16 @@ def qasinModuloCORDIC(t: int, n_bits: int, debug: bool = False):
         if d[i]:
             x_i, y_i = y_i, x_i
 
-        theta_i += 2*(-1 if d[i] else 1)*np.arctan(2**(-i))
+        theta_i += 2*(-1 if d[i] else 1)*atan[i]
         t_i, aux_1, aux_2 = mult(
             t_i, aux_1, aux_2, n, 2*i, modulo=True
         )
 
-    # # plt.scatter(tempX, label="x", marker='hd')
-    # # plt.scatter(tempY, label="y", marker="hd")
-    # plt.scatter([(1<<(n-1)) if s else 0 for s in d], label="d", marker="hd")
-    # plt.title("Modulo")
-    # plt.show()
-
     return theta_i
 
 def main():
+    import plotext as plt
+
     n_bits  = 12
     t       = 4079
 
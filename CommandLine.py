@@ -0,0 +1,263 @@
+
+import argparse
+import os
+import tempfile
+import numpy as np
+
+from Variants import VARIANTS, evaluate
+
+
+def _plotter():
+    '''
+    Imports a plotting backend, only called when a plot is requested.
+    '''
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        import plotext as plt
+    return plt
+
+
+def evaluateCommand(args):
+    if args.t:
+        test = np.array(args.t, dtype=np.int64)
+    else:
+        test = np.linspace(
+            -(1<<args.n_bits), (1<<args.n_bits), num=args.num, dtype=np.int32
+        ).astype(np.int64)
+
+    expected  = np.arcsin(test/(2**args.n_bits))
+    predicted = evaluate(test, args.n_bits, args.variant)
+
+    if args.t:
+        for t, e, p in zip(test.tolist(), expected, predicted):
+            print(f"{t=} | expected={e:.6f} | predicted={p:.6f} | diff={p-e:.6f}")
+    else:
+        errors = np.abs(expected-predicted)
+        print(f"{np.max(errors)               = :.6f}")
+        print(f"{int(test[np.argmax(errors)]) = }")
+        print(f"{np.mean(errors)              = :.6f}")
+        print(f"{np.median(errors)            = :.6f}")
+
+    if args.plot:
+        plt = _plotter()
+        plt.plot(test, expected,  label="Expected")
+        plt.plot(test, predicted, label="Predicted")
+        plt.title(f"CORDIC Approx ({args.variant}, n_bits={args.n_bits})")
+        plt.show()
+
+
+def sweepCommand(args):
+    if args.streaming:
+        from StreamingSweep import streamingSweep
+        results = [
+            streamingSweep(
+                n_bits, args.variant, args.chunk, 
+                checkpoint=args.checkpoint and f"{args.checkpoint}.{n_bits}.json"
+            ).summary()
+            for n_bits in args.n_bits
+        ]
+    else:
+        from Sweep import sweep
+        results = sweep(
+            args.n_bits, args.variant, args.num, args.chunk, args.processes
+        ).values()
+
+    for n_bits, count, maxError, argmax, mean, median in results:
+        print(
+            f"{n_bits=:>3} | {count=:>9} | {maxError=:.6f} | {argmax=:>9}"
+            +f" | {mean=:.6f} | {median=:.6f}"
+        )
+
+
+def benchCommand(args):
+    from Benchmark import main as benchmark
+    benchmark(args.extra)
+
+
+def gateCacheCommand(args):
+    '''
+    Builds the qiskit gates for some register widths and adds them to the
+    gate cache file, so the notebook and scripts load them at startup 
+    instead of constructing the circuits.
+    '''
+    import QuantumGates
+
+    path = args.output or QuantumGates.GATE_CACHE_FILE
+    QuantumGates.loadGateCache(path)
+    for n in args.n:
+        QuantumGates.buildGates(n)
+    count = QuantumGates.saveGateCache(path)
+    print(f"saved {count} gates to {path}")
+
+
+def _raisesValueError(call) -> int:
+    '''
+    Returns 0 if call raises ValueError, 1 if it returns.
+    '''
+    try:
+        call()
+    except ValueError:
+        return 0
+    return 1
+
+
+def verifyCommand(args):
+    '''
+    Runs the equivalence checks between the emulators and circuits.
+    '''
+    import FullPrototypeClassical
+    from MultTable import checkMultTable
+    from PermutationSim import checkCORDICGates, checkMultGate
+    from Peephole import checkCancelGates
+    from Reversibility import checkAdd, checkMultImproved
+    from ShiftAddFromScratch import checkRippleCarryAdd
+    from StreamingSweep import checkStreamingStats
+    import ReversibleGates
+    from ReversibleGates import cordicLayout, layout, multGates
+    from TraceIR import traceCORDIC, replayBatch
+    from WideRegister import qasinModuloCORDICWide
+
+    failures = 0
+
+    def report(name: str, errors: int):
+        nonlocal failures
+        failures += errors != 0
+        print(f"{'ok  ' if errors == 0 else 'FAIL'} {name} ({errors=})")
+
+    n_bits = args.n_bits
+    test   = np.arange(-(1<<n_bits), (1<<n_bits)+1, dtype=np.int64)
+    scalar = np.array([
+        FullPrototypeClassical.qasinModuloCORDIC(int(t), n_bits) for t in test
+    ])
+
+    report("batch CORDIC == scalar CORDIC", int(np.sum(
+        FullPrototypeClassical.qasinModuloCORDICBatch(test, n_bits) != scalar
+    )))
+    report("TraceIR replay == scalar CORDIC", int(np.sum(
+        replayBatch(traceCORDIC(n_bits), test) != scalar
+    )))
+    report("wide registers == scalar CORDIC", int(np.sum(
+        qasinModuloCORDICWide(test, n_bits) != scalar
+    )))
+
+    n = n_bits+2
+    report("CORDIC circuit == scalar CORDIC", checkCORDICGates(n_bits, "ripple"))
+    report(
+        "lookahead CORDIC circuit == scalar CORDIC", 
+        checkCORDICGates(n_bits, "lookahead")
+    )
+    default = ReversibleGates.DEFAULT_ADDER
+    try:
+        ReversibleGates.DEFAULT_ADDER = "lookahead"
+        report(
+            "CORDIC circuit with lookahead default == scalar CORDIC", 
+            checkCORDICGates(n_bits) + ("anc" not in cordicLayout(n_bits))
+        )
+        report(
+            "multGates without ancillas raises with lookahead default", 
+            _raisesValueError(lambda: list(multGates(*layout(n, 4), n=n, m=1)))
+        )
+    finally:
+        ReversibleGates.DEFAULT_ADDER = default
+
+    report("multGate circuit == multImproved", sum(
+        checkMultGate(n, m) for m in range(1, 2*n)
+    ))
+    report("lookahead multGate circuit == multImproved", sum(
+        checkMultGate(n, m, adder="lookahead") for m in range(1, 2*n)
+    ))
+    small = min(n, 5)
+    report("multTable == multImproved", sum(
+        checkMultTable(small, m) for m in range(1, 2*small+2)
+    ))
+    report("peephole multGate == multGate", sum(
+        checkCancelGates(n, m) for m in range(1, 2*n)
+    ))
+    report("ripple carry adder == add", checkRippleCarryAdd(small))
+    report("streaming stats == sweep stats", checkStreamingStats(small))
+
+    try:
+        import QuantumGates
+    except ImportError:
+        print("skip qiskit gate checks, qiskit is not installed")
+    else:
+        report("qiskit multGate == multGates gate for gate", sum(
+            QuantumGates.checkGateList(small, m, adder)
+            for m in range(1, 2*small) for adder in ReversibleGates.ADDERS
+        ))
+        with tempfile.TemporaryDirectory() as directory:
+            report("gate cache reload has no misses", QuantumGates.checkGateCache(
+                small, os.path.join(directory, "gates.qpy")
+            ))
+    reversibility = [
+        checkAdd(small, shift, negativeY) 
+        for shift in range(small+1) for negativeY in (False, True)
+    ] + [checkMultImproved(small, m) for m in range(1, 2*small)]
+    report("add and multImproved are reversible", sum(
+        not r.ok for r in reversibility
+    ))
+
+    return failures
+
+
+def main(argv: list[str] = None) -> int:
+    parser   = argparse.ArgumentParser(
+        description="Classical emulation of the quantum arcsin CORDIC"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    variant = argparse.ArgumentParser(add_help=False)
+    variant.add_argument("--variant", choices=list(VARIANTS), default="modulo")
+
+    p = commands.add_parser(
+        "evaluate", parents=[variant], help="evaluate arcsin on some inputs"
+    )
+    p.add_argument("t", type=int, nargs="*", 
+                   help="fixed point inputs, evenly spaced ones if omitted")
+    p.add_argument("--n-bits", type=int, default=10)
+    p.add_argument("--num", type=int, default=2048)
+    p.add_argument("--plot", action="store_true")
+    p.set_defaults(run=evaluateCommand)
+
+    p = commands.add_parser(
+        "sweep", parents=[variant], help="error statistics over all inputs"
+    )
+    p.add_argument("--n-bits", type=int, nargs="+", default=[10, 12])
+    p.add_argument("--num", type=int, help="evenly spaced inputs only")
+    p.add_argument("--chunk", type=int, default=1<<15)
+    p.add_argument("--processes", type=int)
+    p.add_argument("--streaming", action="store_true",
+                   help="constant memory, approximate median")
+    p.add_argument("--checkpoint", help="checkpoint prefix (--streaming)")
+    p.set_defaults(run=sweepCommand)
+
+    p = commands.add_parser(
+        "bench", help="run Benchmark.py, other arguments are forwarded to it"
+    )
+    p.set_defaults(run=benchCommand)
+
+    p = commands.add_parser(
+        "gate-cache", help="build the qiskit gates and save them to a file"
+    )
+    p.add_argument("-n", type=int, nargs="+", default=[5],
+                   help="register widths, the notebook uses 5")
+    p.add_argument("--output", help="QPY file, QuantumGates.GATE_CACHE_FILE "
+                   "by default")
+    p.set_defaults(run=gateCacheCommand)
+
+    p = commands.add_parser(
+        "verify", help="check the emulators and circuits agree"
+    )
+    p.add_argument("--n-bits", type=int, default=6)
+    p.set_defaults(run=verifyCommand)
+
+    args, args.extra = parser.parse_known_args(argv)
+    if args.extra and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(args.extra)}")
+
+    return int(bool(args.run(args)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,10 @@
 
 import numpy as np
-from functools import cache
 
-try:
-    import matplotlib.pyplot as plt
-except ImportError:
-    import plotext as plt
+from Schedule import arctanTable, iterationsForError, multSchedule
+from RegisterFile import RegisterFile
+from TraceIR import X, Y, T, AUX_1, AUX_2
+from Trace import TraceHook
 
 def bitshift(x: int, shift: int, n_bits: int) -> int:
     '''
@@ -57,19 +56,6 @@ def add(
 
     return x%N, y%N
 
-@cache
-def fib(i:int) -> int: 
-    '''
-    Fibonacci numbers { 1,1,3,5,8,13, ... }
-
-    i (int): Index of Fibonacci number
-
-    return (int): i^th Fibonacci number
-    '''
-    return int(np.round(
-        1/(5**.5) * (((1+5**.5)/2)**(i+1)-((1-5**.5)/2)**(i+1))
-    ))
-
 
 def mult(
         x: int, aux_1: int, aux_2: int, n: int, m: int, 
@@ -95,19 +81,20 @@ def mult(
     x, aux_2 = add(x, aux_2, m, n=n)
     aux_1, x = add(aux_1, x, 0, n=n)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))):
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=(fib(i)%2==1))
+    schedule = multSchedule(n, m)
+    for step in schedule.forward:
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=(fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_2, aux_1 = add(aux_2, aux_1, 0, n=n, negativeY=True)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))-1, -1, -1):
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=not (fib(i)%2==1))
+    for step in schedule.backward:
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=not (fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_1, x = add(aux_1, x, 0, n, negativeY=True)
 
@@ -126,7 +113,9 @@ def isneg(value: int, n_bits: int) -> bool:
     return (value & (1<<(n_bits-1))) != 0
 
 
-def qasinModuloCORDIC(t: int, n_bits: int) -> float:
+def qasinModuloCORDIC(
+        t: int, n_bits: int, trace: TraceHook = None
+    ) -> float:
     '''
     Unitary version of double rotation CORDIC algorithm (TODO: cite the paper)
 
@@ -141,6 +130,7 @@ def qasinModuloCORDIC(t: int, n_bits: int) -> float:
     t (int) [-(1<<n_bits),1<<n_bits]: Input angle written in 
         fixed point notation two's complement
     n_bits (int): Number of bits used to describe t
+    trace (TraceHook): Called every iteration, see Trace.py
 
     return (float): theta_{n_bits+2}
     '''
@@ -152,6 +142,7 @@ def qasinModuloCORDIC(t: int, n_bits: int) -> float:
     aux_1:      int = 0
     aux_2:      int = 0
     d:   list[bool] = []
+    atan            = arctanTable(n)
 
     for i in range(1, n):
         #Note: The original paper's equation for d introduced some
@@ -159,6 +150,8 @@ def qasinModuloCORDIC(t: int, n_bits: int) -> float:
         d.append(
             isneg(x_i, n) != (isneg(t_i - (0 if isneg(x_i, n) else y_i), n))
         )
+        if trace is not None:
+            trace(i, x_i, y_i, t_i, aux_1, aux_2, theta_i, d[-1])
 
         if d[-1]:
             x_i, y_i = y_i, x_i
@@ -171,7 +164,7 @@ def qasinModuloCORDIC(t: int, n_bits: int) -> float:
         if d[-1]:
             x_i, y_i = y_i, x_i
 
-        theta_i += 2*(-1 if d[-1] else 1)*np.arctan(2**(-i))
+        theta_i += 2*(-1 if d[-1] else 1)*atan[i]
         t_i, aux_1, aux_2 = mult(
             t_i, aux_1, aux_2, n, 2*i
         )
@@ -179,12 +172,217 @@ def qasinModuloCORDIC(t: int, n_bits: int) -> float:
     return theta_i
 
 
+def bitshiftBatch(x: np.ndarray, shift: int, n_bits: int) -> np.ndarray:
+    '''
+    Vectorized version of bitshift, works on a whole array of registers.
+    Note: The leftmost bit is copied leftwards, i.e., 1010>>1 == 1101.
+
+    x      (np.ndarray): Values to be bitshifted (int64).
+    shift         (int): How far the values are shifted right, non-negative.
+    n_bits        (int): Number of bits representing x.
+
+    return (np.ndarray): Right bitshifted x.
+    '''
+    N       = 1<<n_bits
+    x       = x%N
+    signed  = x - ((x>>(n_bits-1))&1)*N
+
+    return (signed>>min(shift, n_bits))%N
+
+
+def addBatch(
+        x: np.ndarray, y: np.ndarray, shift: int, n: int = 8,
+        negativeY: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Vectorized version of add, bitshifts y in two's complement and adds 
+    result to x.
+
+    x   (np.ndarray): Numbers to be added to
+    y   (np.ndarray): Numbers adding into x
+    shift      (int): Bitshift applied to y before addition
+    n          (int): Number of bits
+    negativeY (bool): Subtracts y if true
+    '''
+    N = 1<<n
+    x = x%N; y = y%N
+
+    if negativeY:
+        x = x - bitshiftBatch(y, shift, n)
+    else:
+        x = x + bitshiftBatch(y, shift, n)
+
+    return x%N, y
+
+
+def multBatch(
+        x: np.ndarray, aux_1: np.ndarray, aux_2: np.ndarray, n: int, m: int, 
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Vectorized version of mult, see mult for details.
+
+    x     (np.ndarray): Values being multiplied
+    aux_1 (np.ndarray): First auxiliary registers
+    aux_2 (np.ndarray): Second auxiliary registers
+    n            (int): Number of bits representing x
+    m            (int): x is multiplied by 1+2^(-m)
+
+    return (tuple[np.ndarray, np.ndarray, np.ndarray]): newX, newAux_1, newAux_2
+    '''
+    aux_2, x = addBatch(aux_2, x, 0, n=n)
+    x, aux_2 = addBatch(x, aux_2, m, n=n)
+    aux_1, x = addBatch(aux_1, x, 0, n=n)
+    
+    schedule = multSchedule(n, m)
+    for step in schedule.forward:
+        if step.intoAux:
+            aux_1, x = addBatch(aux_1, x, step.shift, n, negativeY=step.negative)
+        else:
+            x, aux_1 = addBatch(x, aux_1, step.shift, n, negativeY=step.negative)
+
+    aux_2, aux_1 = addBatch(aux_2, aux_1, 0, n=n, negativeY=True)
+    
+    for step in schedule.backward:
+        if step.intoAux:
+            aux_1, x = addBatch(aux_1, x, step.shift, n, negativeY=step.negative)
+        else:
+            x, aux_1 = addBatch(x, aux_1, step.shift, n, negativeY=step.negative)
+
+    aux_1, x = addBatch(aux_1, x, 0, n, negativeY=True)
+
+    return x, aux_1, aux_2
+
+
+def _qasinModuloCORDICRegisters(
+        t: np.ndarray, n_bits: int, trace: TraceHook = None, 
+        iterations: int = None
+    ) -> RegisterFile:
+    '''
+    Runs the CORDIC iterations of qasinModuloCORDICBatch and returns the
+    final register file, theta and the x, y registers included. Stops 
+    after the given number of iterations, all n_bits+1 by default.
+    '''
+    n = n_bits+2
+    registers = RegisterFile(n, t.size)
+    registers.load(X, (1<<n_bits)-1)
+    registers.load(T, t.ravel())
+    atan = arctanTable(n)
+    if iterations is None:
+        iterations = n-1
+
+    for i in range(1, iterations+1):
+        d = registers.decide()
+        if trace is not None:
+            regs = registers.regs
+            trace(
+                i, regs[X], regs[Y], regs[T], regs[AUX_1], regs[AUX_2], 
+                registers.theta, d
+            )
+
+        registers.swap(X, Y, where=d)
+        for _ in range(2):
+            registers.add(X, Y, i, negative=True)
+            registers.mult(Y, 2*i)
+            registers.add(Y, X, i, negative=False)
+        registers.swap(X, Y, where=d)
+
+        registers.rotate(atan[i])
+        registers.mult(T, 2*i)
+
+    return registers
+
+
+def qasinModuloCORDICBatch(
+        t: np.ndarray, n_bits: int, trace: TraceHook = None
+    ) -> np.ndarray:
+    '''
+    Vectorized version of qasinModuloCORDIC, evaluates a whole array of 
+    inputs at once. Results match qasinModuloCORDIC bit for bit.
+    Note: registers are int64, so n_bits must be at most 60.
+
+    t (np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles written in 
+        fixed point notation two's complement
+    n_bits (int): Number of bits used to describe t
+    trace (TraceHook): Called every iteration with the whole batch, see 
+        Trace.py
+
+    return (np.ndarray): theta_{n_bits+2} for every input
+    '''
+    t = np.asarray(t, dtype=np.int64)
+    return _qasinModuloCORDICRegisters(t, n_bits, trace).theta.reshape(t.shape)
+
+
+def qasinModuloCORDICPrecision(
+        t: np.ndarray, n_bits: int, targetError: float, 
+        trace: TraceHook = None
+    ) -> tuple[np.ndarray, int]:
+    '''
+    qasinModuloCORDICBatch stopped as soon as the remaining rotation 
+    angles sum_{i>k} 2*arctan(2^(-i)) fall below targetError. Registers 
+    keep their n_bits+2 width, only the number of iterations shrinks, so 
+    latency drops proportionally for low precision queries. The error is 
+    still bounded below by the error of the full run.
+
+    t (np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles written in 
+        fixed point notation two's complement
+    n_bits (int): Number of bits used to describe t
+    targetError (float): Acceptable truncation error in radians
+    trace (TraceHook): Called every iteration with the whole batch, see 
+        Trace.py
+
+    return (tuple[np.ndarray, int]): theta_k for every input and the 
+        number of iterations k that were run
+    '''
+    t = np.asarray(t, dtype=np.int64)
+    iterations = iterationsForError(n_bits+2, targetError)
+    registers  = _qasinModuloCORDICRegisters(t, n_bits, trace, iterations)
+    return registers.theta.reshape(t.shape), iterations
+
+
+def qasinAcosModuloCORDICBatch(
+        t: np.ndarray, n_bits: int, trace: TraceHook = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Evaluates arcsin and arccos of the same inputs with a single CORDIC 
+    run. arccos is pi/2-theta, and the final x and y registers hold
+        x ~= cordicGain(n)*(2^n_bits-1)*sqrt(1-(t/2^n_bits)^2)
+        y ~= cordicGain(n)*(2^n_bits-1)*t/2^n_bits
+    with n = n_bits+2, so sqrt(1-t^2) comes for free as well.
+
+    t (np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles written in 
+        fixed point notation two's complement
+    n_bits (int): Number of bits used to describe t
+    trace (TraceHook): Called every iteration with the whole batch, see 
+        Trace.py
+
+    return (tuple): arcsin, arccos, signed x register, signed y register
+    '''
+    t = np.asarray(t, dtype=np.int64)
+    n = n_bits+2
+    registers = _qasinModuloCORDICRegisters(t, n_bits, trace)
+
+    x, y  = registers.regs[X], registers.regs[Y]
+    x     = np.where(x & (1<<(n-1)), x-(1<<n), x)
+    y     = np.where(y & (1<<(n-1)), y-(1<<n), y)
+    theta = registers.theta
+
+    return (
+        theta.reshape(t.shape), (np.pi/2-theta).reshape(t.shape), 
+        x.reshape(t.shape), y.reshape(t.shape),
+    )
+
+
 def main():
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        import plotext as plt
+
     n_bits    = 10
 
     test      = np.linspace(-(1<<n_bits), (1<<n_bits), num=2048, dtype=np.int32)
     expected  = np.arcsin(test/(2**n_bits))
-    predicted = np.array([qasinModuloCORDIC(t, n_bits) for t in test])
+    predicted = qasinModuloCORDICBatch(test, n_bits)
 
     plt.plot(test, expected,  label="Expected")
     plt.plot(test, predicted, label="Predicted")
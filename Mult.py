@@ -1,15 +1,9 @@
 
 import numpy as np
-from functools import cache
 
 from ModuloBitShift import bitshift
 from ShiftAdd import add
-
-@cache
-def fib(i:int) -> int: 
-    return int(np.round(
-        1/(5**.5) * (((1+5**.5)/2)**(i+1)-((1-5**.5)/2)**(i+1))
-    ))
+from Schedule import multSchedule
 
 def mult(
         x: int, aux: int, n: int, m: int, modulo: bool = False, 
@@ -53,25 +47,28 @@ def _multImprovedNonModulo(
     if debug:
         print(f"Init: \n\t{(x,aux_1,aux_2)=}")
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))):
+    schedule = multSchedule(n, m)
+    for i, step in enumerate(schedule.forward):
         if debug:
             print(f"{i=} | {x=} | {aux_1=}")
-        if i%2 == 0:
-            x     += ((-1)**fib(i)) * (aux_1>>(m*fib(i)))
+        if step.intoAux:
+            aux_1 += (-1 if step.negative else 1) * (x>>step.shift)
         else:
-            aux_1 += ((-1)**fib(i)) * (x>>(m*fib(i)))
+            x     += (-1 if step.negative else 1) * (aux_1>>step.shift)
 
     if debug:
         print(f"aux_2 -= aux_1 | {aux_2} -= {aux_1} ({aux_2-aux_1})")
     aux_2 -= aux_1
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))-1, -1, -1):
+    for i, step in zip(
+            range(len(schedule.backward)-1, -1, -1), schedule.backward
+        ):
         if debug:
             print(f"{i=} | {x=} | {aux_1=}")
-        if i%2 == 0:
-            x     -= ((-1)**fib(i)) * (aux_1>>(m*fib(i)))
+        if step.intoAux:
+            aux_1 += (-1 if step.negative else 1) * (x>>step.shift)
         else:
-            aux_1 -= ((-1)**fib(i)) * (x>>(m*fib(i)))
+            x     += (-1 if step.negative else 1) * (aux_1>>step.shift)
 
     aux_1 -= x
 
@@ -96,25 +93,28 @@ def multImproved(
     x += bitshift(aux_2, m, n)
     aux_1, x = add(aux_1, x, 0, n=n)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))):
+    schedule = multSchedule(n, m)
+    for i, step in enumerate(schedule.forward):
         if debug:
             print(f"{i=} | {x=} | {aux_1=}")
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=(fib(i)%2==1))
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=(fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     if debug:
         print(f"aux_2 -= aux_1 | {aux_2} -= {aux_1} ({aux_2-aux_1})")
     aux_2, aux_1 = add(aux_2, aux_1, 0, n=n, negativeY=True)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))-1, -1, -1):
+    for i, step in zip(
+            range(len(schedule.backward)-1, -1, -1), schedule.backward
+        ):
         if debug:
             print(f"{i=} | {x=} | {aux_1=}")
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=not (fib(i)%2==1))
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=not (fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_1, x = add(aux_1, x, 0, n, negativeY=True)
 
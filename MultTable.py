@@ -0,0 +1,110 @@
+
+import numpy as np
+from functools import cache
+
+from FullPrototypeClassical import addBatch, bitshiftBatch, multBatch
+from Schedule import multSchedule
+
+MAX_TABLE_BITS: int = 12
+
+
+@cache
+def ladderTable(n: int, m: int) -> np.ndarray:
+    '''
+    aux_1 after the forward Fibonacci ladder of Mult.multImproved, for every
+    (x, aux_1) pair on n bits.
+
+    n (int): Number of bits, at most MAX_TABLE_BITS
+    m (int): x is multiplied by 1+2^(-m)
+
+    return (np.ndarray): Read only array of shape (2^n, 2^n) indexed by 
+        [x, aux_1]
+    '''
+    if n > MAX_TABLE_BITS:
+        raise ValueError(f"{n=} is too large to tabulate ({MAX_TABLE_BITS=})")
+
+    N     = 1<<n
+    table = np.empty((N, N), dtype=np.uint16)
+    rows  = max(1, (1<<20)//N)
+    for start in range(0, N, rows):
+        x, aux_1 = np.meshgrid(
+            np.arange(start, min(start+rows, N), dtype=np.int64),
+            np.arange(N, dtype=np.int64), indexing="ij"
+        )
+        for step in multSchedule(n, m).forward:
+            if step.intoAux:
+                aux_1, x = addBatch(aux_1, x, step.shift, n, step.negative)
+            else:
+                x, aux_1 = addBatch(x, aux_1, step.shift, n, step.negative)
+        table[start:start+rows] = aux_1
+
+    table.flags.writeable = False
+    return table
+
+
+def multTable(
+        x: np.ndarray, aux_1: np.ndarray, aux_2: np.ndarray, n: int, m: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Same result as Mult.multImproved(modulo=True) without running the ladder.
+
+    The backward ladder undoes the forward one exactly, so the whole
+    operation reduces to
+        aux_2' = aux_2 + x
+        x'     = x + (aux_2'>>m)
+        aux_1' = aux_1                  (restored)
+        aux_2' = aux_2' - L(x', aux_1 + x')
+    where L is the aux_1 output of the forward ladder, read from ladderTable.
+
+    x     (np.ndarray | int): Values being multiplied
+    aux_1 (np.ndarray | int): First auxiliary registers
+    aux_2 (np.ndarray | int): Second auxiliary registers
+    n                  (int): Number of bits, at most MAX_TABLE_BITS
+    m                  (int): x is multiplied by 1+2^(-m)
+
+    return (tuple): newX, newAux_1, newAux_2
+    '''
+    N     = 1<<n
+    x     = np.asarray(x, dtype=np.int64)%N
+    aux_1 = np.asarray(aux_1, dtype=np.int64)%N
+    aux_2 = (np.asarray(aux_2, dtype=np.int64)+x)%N
+    x     = (x+bitshiftBatch(aux_2, m, n))%N
+    aux_2 = (aux_2-ladderTable(n, m)[x, (aux_1+x)%N])%N
+
+    return x, aux_1, aux_2
+
+
+def checkMultTable(n: int, m: int) -> int:
+    '''
+    Exhaustively compares multTable with the reference ladder on every 
+    (x, aux_1, aux_2) state of n bits.
+
+    n (int): Number of bits
+    m (int): x is multiplied by 1+2^(-m)
+
+    return (int): Number of states where the two disagree
+    '''
+    N = 1<<n
+    x, aux_1, aux_2 = (
+        v.ravel() for v in np.meshgrid(*[np.arange(N)]*3, indexing="ij")
+    )
+    expected = multBatch(x, aux_1, aux_2, n, m)
+    result   = multTable(x, aux_1, aux_2, n, m)
+
+    return int(np.sum(np.any(np.stack(expected) != np.stack(result), axis=0)))
+
+
+def main():
+    from Mult import multImproved
+
+    for n in range(2, 7):
+        errors = sum(checkMultTable(n, m) for m in range(1, 2*n+2))
+        print(f"{n=} | m in [1, {2*n+1}] | {errors=}")
+
+    n, m = 8, 2
+    print(f"{multImproved(181, 3, 7, n, m, modulo=True) = }")
+    print(f"{tuple(int(v) for v in multTable(181, 3, 7, n, m)) = }")
+
+
+if __name__ == "__main__":
+    main()
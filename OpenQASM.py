@@ -0,0 +1,74 @@
+
+from typing import Iterable, TextIO
+
+from ReversibleGates import Gate, cordicGates, cordicLayout
+
+
+_INSTRUCTIONS = {1: "x", 2: "cx", 3: "ccx"}
+
+
+def writeQASM(
+        gates: Iterable[Gate], registers: dict[str, list[int]], file: TextIO
+    ) -> int:
+    '''
+    Writes a X/CX/CCX gate stream as OpenQASM 2.0, one instruction per 
+    line, consuming the gates one at a time so memory use does not depend 
+    on the length of the circuit.
+
+    gates (Iterable[Gate]): Gates to write, e.g. a cordicGates generator
+    registers (dict[str, list[int]]): Qubits of every register, declared 
+        as one qreg each, prefixed with q_ so x does not clash with the gate
+    file (TextIO): Open text file
+
+    return (int): Number of gates written
+    '''
+    names = {}
+    file.write('OPENQASM 2.0;\ninclude "qelib1.inc";\n')
+    for name, qubits in registers.items():
+        file.write(f"qreg q_{name}[{len(qubits)}];\n")
+        for k, qubit in enumerate(qubits):
+            names[qubit] = f"q_{name}[{k}]"
+
+    count = 0
+    for gate in gates:
+        file.write(
+            f"{_INSTRUCTIONS[len(gate)]} "
+            +",".join(names[qubit] for qubit in gate)+";\n"
+        )
+        count += 1
+
+    return count
+
+
+def writeCORDICQASM(n_bits: int, path: str, adder: str = None) -> int:
+    '''
+    Writes the whole arcsin CORDIC circuit (ReversibleGates.cordicGates) to
+    an OpenQASM file without building a qiskit circuit.
+
+    n_bits (int): Number of bits used to describe t
+    path   (str): Output file
+    adder  (str): Adder used, ReversibleGates.DEFAULT_ADDER if None
+
+    return (int): Number of gates written
+    '''
+    with open(path, "w", buffering=1<<20) as file:
+        return writeQASM(
+            cordicGates(n_bits, adder), cordicLayout(n_bits, adder), file
+        )
+
+
+def main():
+    import time
+
+    for n_bits in (4, 8, 16):
+        path  = f"cordic_{n_bits}.qasm"
+        start = time.perf_counter()
+        count = writeCORDICQASM(n_bits, path)
+        print(
+            f"{n_bits=:>2} | {count=:>8} | "
+            +f"{time.perf_counter()-start:.2f}s | {path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
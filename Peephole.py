@@ -0,0 +1,153 @@
+
+import numpy as np
+from typing import Iterable, NamedTuple
+
+from ReversibleGates import Gate, layout, multGates
+from ResourceEstimate import circuitDepth
+
+
+class PeepholeReport(NamedTuple):
+    '''
+    Gate count and depth of a circuit before and after cancelGates.
+    '''
+    n:              int
+    m:              int
+    gates:          int
+    optimizedGates: int
+    depth:          int
+    optimizedDepth: int
+
+    @property
+    def gatesSaved(self) -> int:
+        return self.gates - self.optimizedGates
+
+    @property
+    def depthSaved(self) -> int:
+        return self.depth - self.optimizedDepth
+
+
+def commutes(a: Gate, b: Gate) -> bool:
+    '''
+    Sufficient condition for two X/CX/CCX gates to commute: neither target
+    is a control of the other. Gates sharing only their target commute.
+    '''
+    return a[-1] not in b[:-1] and b[-1] not in a[:-1]
+
+
+def cancelGates(gates: Iterable[Gate], window: int = 256) -> list[Gate]:
+    '''
+    Removes pairs of identical gates that can be brought next to each other
+    by commuting through the gates in between. X, CX and CCX are 
+    self-inverse, so every such pair is the identity. This catches the 
+    rshiftGates fan that one shift-addition uncomputes and the next one 
+    prepares again with the same source and shift, and anything nested 
+    inside such pairs, since cancelled gates are skipped in later searches.
+
+    gates (Iterable[Gate]): Gates to optimize
+    window (int): Number of earlier gates per qubit searched for a partner
+
+    return (list[Gate]): The optimized gates
+    '''
+    kept:   list[Gate] = []
+    alive:  list[bool] = []
+    onQubit: dict[int, list[int]] = {}
+
+    for gate in gates:
+        gate = tuple(gate)
+        lists   = [onQubit.setdefault(qubit, []) for qubit in gate]
+        cursors = [len(indices)-1 for indices in lists]
+        partner = None
+
+        for _ in range(window):
+            best = -1
+            for k, indices in enumerate(lists):
+                while cursors[k] >= 0 and not alive[indices[cursors[k]]]:
+                    cursors[k] -= 1
+                if cursors[k] >= 0:
+                    best = max(best, indices[cursors[k]])
+            if best < 0:
+                break
+
+            other = kept[best]
+            if other == gate:
+                partner = best
+                break
+            if not commutes(other, gate):
+                break
+            for k, indices in enumerate(lists):
+                if cursors[k] >= 0 and indices[cursors[k]] == best:
+                    cursors[k] -= 1
+
+        if partner is not None:
+            alive[partner] = False
+            continue
+
+        for indices in lists:
+            while indices and not alive[indices[-1]]:
+                indices.pop()
+            indices.append(len(kept))
+        kept.append(gate)
+        alive.append(True)
+
+    return [gate for gate, live in zip(kept, alive) if live]
+
+
+def peepholeMult(n: int, m: int) -> PeepholeReport:
+    '''
+    Runs cancelGates on the ripple multGates and reports the savings.
+
+    n (int): Number of bits
+    m (int): x is multiplied by 1+2^(-m)
+
+    return (PeepholeReport): Gates and depth before and after
+    '''
+    gates     = list(multGates(*layout(n, 4), n=n, m=m, adder="ripple"))
+    optimized = cancelGates(gates)
+
+    return PeepholeReport(
+        n, m, len(gates), len(optimized), 
+        circuitDepth(gates), circuitDepth(optimized),
+    )
+
+
+def checkCancelGates(n: int, m: int, samples: int = 1<<12) -> int:
+    '''
+    Simulates the ripple multGates before and after cancelGates on random 
+    basis states.
+
+    n       (int): Number of bits
+    m       (int): x is multiplied by 1+2^(-m)
+    samples (int): Number of random inputs, rs starts at zero
+
+    return (int): Number of inputs where the two circuits disagree
+    '''
+    from PermutationSim import run
+
+    rng       = np.random.default_rng(n*1000+m)
+    registers = layout(n, 4)
+    values    = [rng.integers(0, 1<<n, samples) for _ in range(3)]
+    values   += [np.zeros(samples, dtype=np.int64)]
+    gates     = list(multGates(*registers, n=n, m=m, adder="ripple"))
+
+    before = run(gates, values, registers, 4*n)
+    after  = run(cancelGates(gates), values, registers, 4*n)
+
+    return int(np.sum(np.any(np.stack(before) != np.stack(after), axis=0)))
+
+
+def main():
+    print(
+        f"{'n':>3} {'m':>3} {'gates':>8} {'saved':>7} "
+        +f"{'depth':>7} {'saved':>7}"
+    )
+    for n in (4, 8, 12, 16):
+        for m in range(1, 2*n, max(1, n//4)):
+            r = peepholeMult(n, m)
+            print(
+                f"{r.n:>3} {r.m:>3} {r.gates:>8} {r.gatesSaved:>7} "
+                +f"{r.depth:>7} {r.depthSaved:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+
+import numpy as np
+from typing import Iterable, Sequence
+
+from ReversibleGates import (
+    Gate, Register, cordicGates, cordicLayout, layout, lookaheadAncillaCount,
+    multGates,
+)
+
+
+def toBitPlanes(
+        values: Sequence[np.ndarray], registers: Sequence[Register], 
+        n_qubits: int,
+    ) -> np.ndarray:
+    '''
+    Packs a batch of basis states into bit planes. Plane q holds qubit q of
+    every basis state, 64 states per uint64 word.
+
+    values    (Sequence[np.ndarray]): Value of every register for each state
+    registers   (Sequence[Register]): Qubits of every register
+    n_qubits                   (int): Total number of qubits
+
+    return (np.ndarray): uint64 array of shape (n_qubits, ceil(batch/64))
+    '''
+    batch  = len(values[0]) if len(values) else 0
+    words  = -(-batch//64)
+    planes = np.zeros((n_qubits, words), dtype=np.uint64)
+
+    for value, register in zip(values, registers):
+        value = np.asarray(value, dtype=np.int64)
+        for k, qubit in enumerate(register):
+            bits = np.packbits((value>>k)&1 == 1, bitorder="little")
+            bits = np.pad(bits, (0, 8*words-len(bits)))
+            planes[qubit] = bits.view(np.uint64)
+
+    return planes
+
+
+def fromBitPlanes(
+        planes: np.ndarray, register: Register, batch: int
+    ) -> np.ndarray:
+    '''
+    Reads one register back out of bit planes.
+
+    planes (np.ndarray): Bit planes from toBitPlanes
+    register (Register): Qubits of the register
+    batch         (int): Number of basis states
+
+    return (np.ndarray): int64 value of the register for each state
+    '''
+    values = np.zeros(batch, dtype=np.int64)
+    for k, qubit in enumerate(register):
+        bits = np.unpackbits(
+            planes[qubit].view(np.uint8), bitorder="little", count=batch
+        )
+        values |= bits.astype(np.int64)<<k
+
+    return values
+
+
+def simulate(gates: Iterable[Gate], planes: np.ndarray) -> np.ndarray:
+    '''
+    Pushes every basis state through a X/CX/CCX gate list, in place.
+
+    gates (Iterable[Gate]): Gates to apply
+    planes    (np.ndarray): Bit planes from toBitPlanes
+
+    return (np.ndarray): planes, updated
+    '''
+    for gate in gates:
+        if len(gate) == 1:
+            np.invert(planes[gate[0]], out=planes[gate[0]])
+        elif len(gate) == 2:
+            planes[gate[1]] ^= planes[gate[0]]
+        else:
+            planes[gate[2]] ^= planes[gate[0]] & planes[gate[1]]
+
+    return planes
+
+
+def run(
+        gates: Iterable[Gate], values: Sequence[np.ndarray], 
+        registers: Sequence[Register], n_qubits: int,
+    ) -> list[np.ndarray]:
+    '''
+    Simulates a batch of basis inputs and returns the output registers.
+
+    gates      (Iterable[Gate]): Gates to apply
+    values (Sequence[np.ndarray]): Input value of every register
+    registers (Sequence[Register]): Qubits of every register
+    n_qubits                (int): Total number of qubits
+
+    return (list[np.ndarray]): Output value of every register
+    '''
+    batch  = len(values[0])
+    planes = simulate(gates, toBitPlanes(values, registers, n_qubits))
+
+    return [fromBitPlanes(planes, register, batch) for register in registers]
+
+
+def checkMultGate(
+        n: int, m: int, aux_1: np.ndarray = None, aux_2: np.ndarray = None,
+        adder: str = None,
+    ) -> int:
+    '''
+    Runs multGates on every x in [0, 2^n) and compares it with 
+    Mult.multImproved in modulo mode (through its TraceIR program).
+
+    n            (int): Number of bits
+    m            (int): x is multiplied by 1+2^(-m)
+    aux_1 (np.ndarray): Initial aux_1 values, zero by default
+    aux_2 (np.ndarray): Initial aux_2 values, zero by default
+    adder        (str): Adder used by multGates
+
+    return (int): Number of inputs where the circuit and emulator disagree,
+        including inputs where the rs register or the ancillas are not 
+        returned to zero
+    '''
+    from TraceIR import Program, executeBatch, traceMult
+
+    x     = np.arange(1<<n, dtype=np.int64)
+    aux_1 = np.zeros_like(x) if aux_1 is None else aux_1
+    aux_2 = np.zeros_like(x) if aux_2 is None else aux_2
+    rs    = np.zeros_like(x)
+
+    registers = layout(n, 4)
+    ancReg    = list(range(4*n, 4*n+lookaheadAncillaCount(n)))
+    #Ancillas read back in chunks of n qubits so values fit in int64
+    ancillas  = [ancReg[k:k+n] for k in range(0, len(ancReg), n)]
+    outputs   = run(
+        multGates(*registers, n=n, m=m, adder=adder, ancReg=ancReg), 
+        [x, aux_1, aux_2, rs]+[rs]*len(ancillas), registers+ancillas, 
+        4*n+len(ancReg)
+    )
+
+    expected = np.stack([x, aux_1, aux_2])
+    executeBatch(Program(n, tuple(traceMult(n, m, 0, 1, 2))), expected)
+
+    return int(np.sum(
+        np.any(np.stack(outputs[:3]) != expected, axis=0) 
+        | np.any(np.stack(outputs[3:]) != 0, axis=0)
+    ))
+
+
+def checkCORDICGates(n_bits: int, adder: str = None) -> int:
+    '''
+    Runs cordicGates on every t in [-(1<<n_bits), 1<<n_bits] and compares 
+    the angle read from the decision bits with 
+    FullPrototypeClassical.qasinModuloCORDICBatch.
+
+    n_bits (int): Number of bits used to describe t
+    adder  (str): Adder used, ReversibleGates.DEFAULT_ADDER if None
+
+    return (int): Number of inputs where the circuit and emulator disagree,
+        including inputs where rs, e or the ancillas are not returned to 
+        zero
+    '''
+    from FullPrototypeClassical import qasinModuloCORDICBatch
+    from Schedule import arctanTable
+
+    n         = n_bits+2
+    test      = np.arange(-(1<<n_bits), (1<<n_bits)+1, dtype=np.int64)
+    registers = cordicLayout(n_bits, adder)
+
+    #Registers read back in chunks of at most n qubits so values fit in int64
+    names, chunks = [], []
+    for name, qubits in registers.items():
+        for k in range(0, len(qubits), n):
+            names.append(name)
+            chunks.append(qubits[k:k+n])
+    outputs = run(
+        cordicGates(n_bits, adder),
+        [test%(1<<n) if name == "t" else np.zeros_like(test) for name in names],
+        chunks, sum(len(qubits) for qubits in registers.values()),
+    )
+
+    d     = outputs[names.index("d")]
+    atan  = arctanTable(n)
+    theta = np.zeros(len(test))
+    for i in range(1, n):
+        theta += 2*np.where((d>>(i-1))&1, -1, 1)*atan[i]
+
+    dirty = np.zeros(len(test), dtype=bool)
+    for name, output in zip(names, outputs):
+        if name in ("rs", "e", "anc"):
+            dirty |= output != 0
+
+    return int(np.sum(
+        (theta != qasinModuloCORDICBatch(test, n_bits)) | dirty
+    ))
+
+
+def main():
+    rng = np.random.default_rng()
+    for n in range(8, 17, 2):
+        for m in (1, 2, n//2, n-1):
+            aux = rng.integers(0, 1<<n, size=(2, 1<<n))
+            print(
+                f"{n=:>2} | {m=:>2} | clean aux errors={checkMultGate(n, m)}"
+                +f" | random aux errors={checkMultGate(n, m, *aux)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
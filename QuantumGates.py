@@ -0,0 +1,354 @@
+
+import os
+from qiskit import QuantumCircuit as qc, QuantumRegister as qr, qpy
+from qiskit.circuit.gate import Gate
+
+import ReversibleGates
+from ReversibleGates import (
+    lookaheadAdditionGates, lookaheadAncillaCount, resolveAdder,
+)
+from Schedule import multSchedule
+
+GATE_CACHE_FILE: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "gate_cache.qpy"
+)
+
+# Built gates, keyed by ("rshift", n, rshift), ("add", n, rshift, inverse)
+# and ("mult", n, m), with "lookahead" appended for that adder
+_gates: dict[tuple, Gate] = {}
+
+
+def _registerWidth(*registers: qr) -> int:
+    return min(len(register) for register in registers)
+
+
+def _cached(key: tuple, build) -> Gate:
+    if key not in _gates:
+        _gates[key] = build()
+    return _gates[key]
+
+
+def rshiftGate(inReg: qr, outReg: qr, rshift: int, n: int) -> Gate:
+    '''
+    Copies inReg right shifted in two's complement into outReg.
+    Note: shifts larger than n fill outReg with the sign bit.
+
+    inReg  (qr): Register being copied
+    outReg (qr): Register receiving the copy
+    rshift (int): The amount right shifted, non-negative only
+    n      (int): Number of bits
+
+    Returns:
+        Gate: Cached gate for the desired transformation
+    '''
+    rshift = min(rshift, n)
+
+    def build() -> Gate:
+        inReg, outReg = qr(n, name="in"), qr(n, name="out")
+        circuit = qc(inReg, outReg, name=f"{rshift=}")
+
+        for i in range(n-rshift):
+            circuit.cx(inReg[i+rshift], outReg[i])
+        for i in range(n-rshift, n):
+            circuit.cx(inReg[n-1], outReg[i])
+
+        return circuit.to_gate()
+
+    return _cached(("rshift", n, rshift), build)
+
+
+def _lookaheadAdditionGate(n: int, rshift: int, inverse: bool) -> Gate:
+    rshift = min(rshift, n)
+    if inverse:
+        return _cached(
+            ("add", n, rshift, True, "lookahead"),
+            lambda: _lookaheadAdditionGate(n, rshift, False).inverse()
+        )
+
+    def build() -> Gate:
+        registers = [
+            qr(n, name="x"), qr(n, name="y"), qr(n, name="s"), 
+            qr(lookaheadAncillaCount(n), name="anc"),
+        ]
+        circuit = qc(*registers, name=f"+y>>{rshift} (lookahead)")
+        qubits  = circuit.qubits
+        for gate in lookaheadAdditionGates(
+            *ReversibleGates.layout(n, 3), 
+            list(range(3*n, circuit.num_qubits)), rshift
+        ):
+            if len(gate) == 1:
+                circuit.x(qubits[gate[0]])
+            elif len(gate) == 2:
+                circuit.cx(qubits[gate[0]], qubits[gate[1]])
+            else:
+                circuit.ccx(*(qubits[qubit] for qubit in gate))
+
+        return circuit.to_gate()
+
+    return _cached(("add", n, rshift, False, "lookahead"), build)
+
+
+def _shiftAdditionGate(n: int, rshift: int, inverse: bool) -> Gate:
+    rshift = min(rshift, n)
+    if inverse:
+        return _cached(
+            ("add", n, rshift, True),
+            lambda: _shiftAdditionGate(n, rshift, False).inverse()
+        )
+
+    def build() -> Gate:
+        xReg  = qr(n, name="x")
+        yReg  = qr(n, name="y")
+        rsReg = qr(n, name="s")
+        circuit = qc(xReg, yReg, rsReg, name=f"+y>>{rshift}")
+        shift   = rshiftGate(yReg, rsReg, rshift, n)
+
+        #Prepare shifted y
+        circuit.append(shift, yReg[:] + rsReg[:])
+
+        #Step 1
+        for i in range(1,n):
+            circuit.cx(rsReg[i], xReg[i])
+        #Step 2
+        for i in range(n-2, 0, -1):
+            circuit.cx(rsReg[i], rsReg[i+1])
+        #Step 3
+        for i in range(n-1):
+            circuit.ccx(rsReg[i], xReg[i], rsReg[i+1])
+        #Step 4
+        for i in range(n-1, 0, -1):
+            circuit.cx(rsReg[i], xReg[i])
+            circuit.ccx(rsReg[i-1], xReg[i-1], rsReg[i])
+        #Step 5
+        for i in range(1, n-1):
+            circuit.cx(rsReg[i], rsReg[i+1])
+        #Step 6
+        for i in range(n):
+            circuit.cx(rsReg[i], xReg[i])
+
+        #Uncompute shifted y
+        circuit.append(shift.inverse(), yReg[:] + rsReg[:])
+
+        return circuit.to_gate()
+
+    return _cached(("add", n, rshift, False), build)
+
+
+def shiftAdditionGate(
+        xReg: qr, yReg: qr, rsReg: qr, rshift: int = 0, inverse: bool = False,
+        adder: str = None, ancReg: qr = None,
+    ) -> Gate:
+    """Adds right shifted y to x register. Respects two's complement sign stuff.
+        Based on the simplest version of an algorithm from:
+            Quantum Addition Circuits and Unbounded Fan-Out
+            Authors: Yasuhiro Takahashi, Seiichiro Tani, Noboru Kunihiro
+        Gates are cached by (register width, rshift, inverse).
+
+    Args:
+        xReg   (qr): Register to be added to
+        yReg   (qr): Register which has input
+        rsReg  (qr): Register to hold the bitshifted version of y.
+        rshift (int, optional): The amount right shifted, non-negative only. Defaults to 0.
+        inverse (bool, optional): Subtracts instead. Defaults to False.
+        adder (str, optional): "ripple" or "lookahead" (log depth, acts on 
+            ancReg as well). Defaults to ReversibleGates.DEFAULT_ADDER, raises 
+            ValueError if that is lookahead and ancReg is not given.
+        ancReg (qr, optional): lookaheadAncillaCount(n) zero ancillas, 
+            needed by the lookahead adder.
+
+    Returns:
+        Gate: Gate for the desired transformation
+    """
+    n = _registerWidth(xReg, yReg, rsReg)
+    if resolveAdder(adder, ancReg) == "lookahead":
+        return _lookaheadAdditionGate(n, rshift, inverse)
+    return _shiftAdditionGate(n, rshift, inverse)
+
+
+def multGate(
+        xReg: qr, aux1Reg: qr, aux2Reg: qr, rsReg: qr, n: int, m: int,
+        adder: str = None, ancReg: qr = None,
+    ) -> Gate:
+    '''
+    In place multiplication integer by 1+2^(-m) with some error depending on 
+    how clean the auxiliary registers are. Gates are cached by (n, m).
+    Note: the aux_2 register can gain some error
+
+    xReg     (qr): Register being multiplied
+    aux1Reg  (qr): First auxiliary register, used to help clean aux_2
+    aux2Reg  (qr): Second auxiliary register, stores a copy of xReg
+    rsReg    (qr): Auxiliary Register for the addition stuff
+    n       (int): Number of bits representing xReg
+    m       (int): xReg is multiplied by 1+2^(-m)
+    adder   (str): "ripple" or "lookahead", the lookahead gate also acts on 
+        ancReg. Defaults to ReversibleGates.DEFAULT_ADDER, raises ValueError 
+        if that is lookahead and ancReg is not given
+    ancReg   (qr): lookaheadAncillaCount(n) zero ancillas for the lookahead 
+        adder
+
+    Return:
+        Gate: Circuit to perform the operation
+    '''
+    lookahead = resolveAdder(adder, ancReg) == "lookahead"
+
+    def build() -> Gate:
+        xReg    = qr(n, name="x");     aux1Reg = qr(n, name="aux_1")
+        aux2Reg = qr(n, name="aux_2"); rsReg   = qr(n, name="rs")
+        ancReg  = [qr(lookaheadAncillaCount(n), name="anc")] if lookahead else []
+        circuit = qc(
+            xReg, aux1Reg, aux2Reg, rsReg, *ancReg, name=f"x(1+2^(-{m}))"
+        )
+        schedule = multSchedule(n, m)
+
+        def add(target: qr, source: qr, rshift: int, inverse: bool = False):
+            if lookahead:
+                circuit.append(
+                    _lookaheadAdditionGate(n, rshift, inverse),
+                    target[:] + source[:] + rsReg[:] + ancReg[0][:]
+                )
+                return
+            circuit.append(
+                _shiftAdditionGate(n, rshift, inverse),
+                target[:] + source[:] + rsReg[:]
+            )
+
+        add(aux2Reg, xReg, 0)
+        add(xReg, aux2Reg, m)
+        add(aux1Reg, xReg, 0)
+        for step in schedule.forward:
+            if step.intoAux:
+                add(aux1Reg, xReg, step.shift, step.negative)
+            else:
+                add(xReg, aux1Reg, step.shift, step.negative)
+        add(aux2Reg, aux1Reg, 0, True)
+        for step in schedule.backward:
+            if step.intoAux:
+                add(aux1Reg, xReg, step.shift, step.negative)
+            else:
+                add(xReg, aux1Reg, step.shift, step.negative)
+        add(aux1Reg, xReg, 0, True)
+
+        return circuit.to_gate()
+
+    if lookahead:
+        return _cached(("mult", n, m, "lookahead"), build)
+    return _cached(("mult", n, m), build)
+
+
+def saveGateCache(path: str = GATE_CACHE_FILE) -> int:
+    '''
+    Writes every cached gate to a QPY file.
+
+    path (str): File to write
+
+    return (int): Number of gates saved
+    '''
+    circuits = []
+    for key, gate in _gates.items():
+        circuit = gate.definition.copy(name=gate.name)
+        circuit.metadata = {"key": list(key)}
+        circuits.append(circuit)
+
+    with open(path, "wb") as file:
+        qpy.dump(circuits, file)
+
+    return len(circuits)
+
+
+def loadGateCache(path: str = GATE_CACHE_FILE) -> int:
+    '''
+    Fills the gate cache from a QPY file written by saveGateCache, so that no
+    circuit has to be constructed. Does nothing if the file does not exist.
+
+    path (str): File to read
+
+    return (int): Number of gates loaded
+    '''
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "rb") as file:
+        circuits = qpy.load(file)
+
+    for circuit in circuits:
+        _gates.setdefault(tuple(circuit.metadata["key"]), circuit.to_gate())
+
+    return len(circuits)
+
+
+def clearGateCache():
+    '''
+    Empties the in memory gate cache.
+    '''
+    _gates.clear()
+
+
+def buildGates(n: int):
+    '''
+    Builds every shiftAdditionGate (each shift, both directions) and every 
+    multGate for n qubit registers into the cache.
+
+    n (int): Number of bits per register
+    '''
+    registers = [qr(n) for _ in range(4)]
+    for rshift in range(n+1):
+        for inverse in (False, True):
+            shiftAdditionGate(*registers[:3], rshift, inverse, adder="ripple")
+    for m in range(1, 2*n):
+        multGate(*registers, n=n, m=m, adder="ripple")
+
+
+def checkGateList(n: int, m: int, adder: str = "ripple") -> int:
+    '''
+    Flattens multGate and compares it gate for gate with 
+    ReversibleGates.multGates.
+
+    n     (int): Number of bits per register
+    m     (int): xReg is multiplied by 1+2^(-m)
+    adder (str): Adder used by both
+
+    return (int): 0 if the gate lists are equal, 1 otherwise
+    '''
+    registers = [qr(n) for _ in range(4)] + [qr(lookaheadAncillaCount(n))]
+    gate      = multGate(
+        *registers[:4], n=n, m=m, adder=adder, ancReg=registers[4]
+    )
+    circuit   = qc(*registers)
+    circuit.append(gate, circuit.qubits[:gate.num_qubits])
+
+    expected = ReversibleGates.multGates(
+        *ReversibleGates.layout(n, 4), n=n, m=m, adder=adder, 
+        ancReg=list(range(4*n, 4*n+lookaheadAncillaCount(n))),
+    )
+    return int(ReversibleGates.fromQiskit(circuit) != list(expected))
+
+
+def checkGateCache(n: int, path: str) -> int:
+    '''
+    Builds the gates for n qubit registers, saves them, empties the cache 
+    and reloads it, then builds them again. Every gate must come from the 
+    file and match the one built from scratch.
+
+    n    (int): Number of bits per register
+    path (str): Cache file to write
+
+    return (int): Number of cache misses plus gates that changed
+    '''
+    clearGateCache()
+    buildGates(n)
+    built = {key: ReversibleGates.fromQiskit(gate.definition) 
+             for key, gate in _gates.items()}
+    saveGateCache(path)
+
+    clearGateCache()
+    loadGateCache(path)
+    loaded = set(_gates)
+    buildGates(n)
+
+    misses  = len(set(_gates) - loaded)
+    changed = sum(
+        ReversibleGates.fromQiskit(_gates[key].definition) != gates
+        for key, gates in built.items() if key in _gates
+    )
+    return misses + changed + len(set(built) - set(_gates))
+
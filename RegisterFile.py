@@ -0,0 +1,133 @@
+
+import numpy as np
+
+from Schedule import multSchedule
+from TraceIR import X, Y, T, AUX_1, AUX_2
+
+
+class RegisterFile:
+    '''
+    CORDIC state (x, y, t, aux_1, aux_2, the decision bits and theta) for a
+    batch of inputs, kept in one contiguous int64 array of shape 
+    (5, batch), or a narrower integer dtype for small n. Every operation 
+    updates the registers in place using preallocated scratch space, so a 
+    CORDIC run allocates nothing per step. A scalar run is a batch of size 
+    one.
+
+    n        (int): Number of bits per register, at most 62 for int64 (two
+        bits less than the dtype width)
+    regs     (np.ndarray): Registers, indexed by TraceIR.X, Y, T, AUX_1, AUX_2
+    d        (np.ndarray): Decision bit of the current iteration
+    theta    (np.ndarray): Accumulated angle
+    '''
+    __slots__ = (
+        "n", "regs", "d", "theta", "_mask", "_sign", "_shifted", "_swap", 
+        "_notD",
+    )
+
+    def __init__(self, n: int, batch: int, dtype=np.int64):
+        if n > np.iinfo(dtype).bits-2:
+            raise ValueError(
+                f"{n=} does not fit in {np.dtype(dtype).name} registers"
+            )
+
+        self.n        = n
+        self.regs     = np.zeros((5, batch), dtype=dtype)
+        self.d        = np.zeros(batch, dtype=bool)
+        self.theta    = np.zeros(batch)
+        self._mask    = (1<<n)-1
+        self._sign    = 1<<(n-1)
+        self._shifted = np.empty(batch, dtype=dtype)
+        self._swap    = np.empty(batch, dtype=dtype)
+        self._notD    = np.empty(batch, dtype=bool)
+
+    def load(self, register: int, values):
+        '''
+        Sets a register, values are reduced modulo 2^n.
+        '''
+        np.bitwise_and(values, self._mask, out=self.regs[register])
+
+    def bitshift(self, register: int, shift: int) -> np.ndarray:
+        '''
+        Right bitshift in two's complement of a register into scratch space.
+        The result is only valid until the next operation.
+        '''
+        out = self._shifted
+        np.bitwise_and(self.regs[register], self._sign, out=out)
+        np.left_shift(out, 1, out=out)
+        np.subtract(self.regs[register], out, out=out)
+        np.right_shift(out, min(shift, self.n), out=out)
+        np.bitwise_and(out, self._mask, out=out)
+        return out
+
+    def add(self, dst: int, src: int, shift: int, negative: bool = False):
+        '''
+        dst += ±(src>>shift) modulo 2^n, like ShiftAdd.add.
+        '''
+        shifted = self.bitshift(src, shift)
+        if negative:
+            np.subtract(self.regs[dst], shifted, out=self.regs[dst])
+        else:
+            np.add(self.regs[dst], shifted, out=self.regs[dst])
+        np.bitwise_and(self.regs[dst], self._mask, out=self.regs[dst])
+
+    def mult(self, register: int, m: int):
+        '''
+        register *= 1+2^(-m) using aux_1 and aux_2, like 
+        FullPrototypeClassical.mult.
+        '''
+        schedule = multSchedule(self.n, m)
+
+        self.add(AUX_2, register, 0)
+        self.add(register, AUX_2, m)
+        self.add(AUX_1, register, 0)
+        for step in schedule.forward:
+            if step.intoAux:
+                self.add(AUX_1, register, step.shift, step.negative)
+            else:
+                self.add(register, AUX_1, step.shift, step.negative)
+        self.add(AUX_2, AUX_1, 0, True)
+        for step in schedule.backward:
+            if step.intoAux:
+                self.add(AUX_1, register, step.shift, step.negative)
+            else:
+                self.add(register, AUX_1, step.shift, step.negative)
+        self.add(AUX_1, register, 0, True)
+
+    def decide(self) -> np.ndarray:
+        '''
+        Computes the decision bit 
+            d = isneg(x) != isneg(t - (0 if isneg(x) else y))
+        into self.d.
+        '''
+        xNeg, diff = self._notD, self._shifted
+        np.bitwise_and(self.regs[X], self._sign, out=diff)
+        np.not_equal(diff, 0, out=xNeg)
+
+        np.copyto(diff, self.regs[Y])
+        np.copyto(diff, 0, where=xNeg)
+        np.subtract(self.regs[T], diff, out=diff)
+        np.bitwise_and(diff, self._sign, out=diff)
+        np.not_equal(diff, 0, out=self.d)
+        np.not_equal(self.d, xNeg, out=self.d)
+
+        return self.d
+
+    def swap(self, a: int, b: int, where: np.ndarray = None):
+        '''
+        Swaps two registers, only where the mask is set if one is given.
+        '''
+        if where is None:
+            self.regs[[a, b]] = self.regs[[b, a]]
+            return
+        np.copyto(self._swap, self.regs[a])
+        np.copyto(self.regs[a], self.regs[b], where=where)
+        np.copyto(self.regs[b], self._swap, where=where)
+
+    def rotate(self, angle: float):
+        '''
+        theta += 2*(-1 if d else 1)*angle
+        '''
+        np.logical_not(self.d, out=self._notD)
+        np.subtract(self.theta, 2*angle, out=self.theta, where=self.d)
+        np.add(self.theta, 2*angle, out=self.theta, where=self._notD)
@@ -0,0 +1,206 @@
+
+from functools import cache
+from typing import Iterable, NamedTuple
+
+from Schedule import multSchedule
+import ReversibleGates
+from ReversibleGates import (
+    ADDERS, Gate, controlledSwapGates, decisionGates, layout, 
+    lookaheadAdditionGates, lookaheadAncillaCount, shiftAdditionGates,
+)
+
+
+class Resources(NamedTuple):
+    '''
+    Resource counts of a circuit.
+
+    qubits (int): Number of qubits
+    x      (int): Number of X gates
+    cx     (int): Number of CX gates
+    ccx    (int): Number of CCX gates
+    depth  (int): Depth, when blocks are composed this is the sum of their
+        depths, an upper bound on the depth of the composed circuit
+    '''
+    qubits: int
+    x:      int
+    cx:     int
+    ccx:    int
+    depth:  int
+
+    @property
+    def gates(self) -> int:
+        return self.x + self.cx + self.ccx
+
+    def then(self, other: "Resources", times: int = 1) -> "Resources":
+        '''
+        Resources of this block followed by `times` copies of other.
+        '''
+        return Resources(
+            max(self.qubits, other.qubits),
+            self.x   + times*other.x,
+            self.cx  + times*other.cx,
+            self.ccx + times*other.ccx,
+            self.depth + times*other.depth,
+        )
+
+
+def circuitDepth(gates: Iterable[Gate]) -> int:
+    '''
+    Exact depth of a gate list, scheduling each gate as early as possible.
+    '''
+    level: dict[int, int] = {}
+    depth = 0
+    for gate in gates:
+        layer = 1 + max(level.get(qubit, 0) for qubit in gate)
+        for qubit in gate:
+            level[qubit] = layer
+        depth = max(depth, layer)
+
+    return depth
+
+
+@cache
+def shiftAdditionResources(n: int, rshift: int = 0) -> Resources:
+    '''
+    Resources of shiftAdditionGate on n qubit registers: the shift prepare 
+    and unprepare (n CX each) and the six adder steps.
+    '''
+    xReg, yReg, rsReg = layout(n, 3)
+    depth = circuitDepth(shiftAdditionGates(xReg, yReg, rsReg, rshift))
+
+    return Resources(3*n, 0, 7*n-6, 2*n-2, depth)
+
+
+@cache
+def lookaheadAdditionResources(n: int, rshift: int = 0) -> Resources:
+    '''
+    Resources of lookaheadAdditionGates on n qubit registers, counted from 
+    the gate list. Qubits include the lookaheadAncillaCount(n) ancillas.
+    '''
+    ancillas = lookaheadAncillaCount(n)
+    gates    = lookaheadAdditionGates(
+        *layout(n, 3), list(range(3*n, 3*n+ancillas)), rshift
+    )
+    counts   = [sum(len(gate) == k for gate in gates) for k in (1, 2, 3)]
+
+    return Resources(3*n+ancillas, *counts, circuitDepth(gates))
+
+
+def additionResources(n: int, rshift: int = 0, adder: str = "ripple") -> Resources:
+    '''
+    Resources of one shift-addition with the given adder, see 
+    ReversibleGates.ADDERS.
+    '''
+    if adder == "lookahead":
+        return lookaheadAdditionResources(n, rshift)
+    if adder == "ripple":
+        return shiftAdditionResources(n, rshift)
+    raise ValueError(f"Unknown adder {adder!r}, expected one of {ADDERS}")
+
+
+@cache
+def multResources(n: int, m: int, adder: str = "ripple") -> Resources:
+    '''
+    Resources of multGate: three additions, the Fibonacci ladder, one
+    subtraction, the inverse ladder and a final subtraction.
+    '''
+    schedule = multSchedule(n, m)
+    adds     = additionResources(n, 0, adder)
+    total    = Resources(adds.qubits+n, 0, 0, 0, 0)
+    shifts   = [0, m, 0, 0, 0] + [
+        step.shift for step in schedule.forward + schedule.backward
+    ]
+    for shift in shifts:
+        total = total.then(additionResources(n, min(shift, n), adder))
+
+    return total
+
+
+@cache
+def decisionResources(n: int, adder: str = "ripple") -> Resources:
+    '''
+    Resources of the decision bit computation, four additions plus six CX 
+    and one CCX.
+    '''
+    xReg, yReg, tReg, rsReg = layout(n, 4)
+    adds   = additionResources(n, 0, adder)
+    ancReg = list(range(4*n+2, 4*n+2+adds.qubits-3*n))
+    depth  = circuitDepth(decisionGates(
+        xReg, yReg, tReg, rsReg, 4*n, 4*n+1, adder, ancReg
+    ))
+
+    return Resources(
+        adds.qubits+n+2, 4*adds.x, 4*adds.cx+6, 4*adds.ccx+1, depth
+    )
+
+
+@cache
+def controlledSwapResources(n: int) -> Resources:
+    '''
+    Resources of a controlled swap of two n qubit registers.
+    '''
+    aReg, bReg = layout(n, 2, start=1)
+    depth = circuitDepth(controlledSwapGates(0, aReg, bReg))
+
+    return Resources(2*n+1, 0, 2*n, n, depth)
+
+
+def cordicResources(n_bits: int, adder: str = None) -> Resources:
+    '''
+    Resources of the arcsin CORDIC circuit (ReversibleGates.cordicGates)
+    derived from its structure, without building it.
+
+    Every iteration i in [1, n_bits+1] computes a decision bit, swaps x and y
+    around two double rotations (each an addition, a mult by 1+2^(-2i) and 
+    another addition) and multiplies t by 1+2^(-2i).
+
+    n_bits (int): Number of bits used to describe t
+    adder  (str): Adder used, ReversibleGates.DEFAULT_ADDER if None
+
+    return (Resources): The estimate
+    '''
+    adder = ReversibleGates.DEFAULT_ADDER if adder is None else adder
+    n     = n_bits+2
+    total = Resources(
+        6*n + 1 + (n-1) + additionResources(n, 0, adder).qubits-3*n, 
+        n_bits, 0, 0, 1 if n_bits else 0
+    )
+
+    for i in range(1, n):
+        total = (
+            total
+            .then(decisionResources(n, adder))
+            .then(controlledSwapResources(n), 2)
+            .then(additionResources(n, min(i, n), adder), 4)
+            .then(multResources(n, 2*i, adder), 3)
+        )
+
+    return total
+
+
+def main():
+    for adder in ADDERS:
+        print(
+            f"{adder:<10}{'n_bits':>6} {'qubits':>7} {'cx':>12} {'ccx':>12} "
+            +f"{'depth':>12}"
+        )
+        for n_bits in (4, 8, 12, 16, 24, 32, 48, 64):
+            r = cordicResources(n_bits, adder)
+            print(
+                f"{'':<10}{n_bits:>6} {r.qubits:>7} {r.cx:>12} {r.ccx:>12} "
+                +f"{r.depth:>12}"
+            )
+
+    print(f"\n{'n':>6} {'ripple depth':>13} {'lookahead depth':>16} {'ancillas':>9}")
+    for n in (8, 16, 32, 64):
+        ripple, lookahead = (
+            shiftAdditionResources(n, 1), lookaheadAdditionResources(n, 1)
+        )
+        print(
+            f"{n:>6} {ripple.depth:>13} {lookahead.depth:>16} "
+            +f"{lookahead.qubits-ripple.qubits:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
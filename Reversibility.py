@@ -0,0 +1,305 @@
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from itertools import repeat
+from typing import Callable, NamedTuple
+
+from FullPrototypeClassical import addBatch
+from RegisterFile import RegisterFile
+from TraceIR import X, AUX_1, AUX_2
+
+
+class ReversibilityReport(NamedTuple):
+    '''
+    Result of an exhaustive reversibility check.
+
+    name         (str): Operation checked
+    n            (int): Number of bits per register
+    states       (int): Number of input states enumerated
+    collisions   (int): Inputs mapped onto an already reached output, zero
+        iff the operation is a bijection of the register space
+    auxFailures  (int): Inputs whose auxiliary register was not restored
+    examples (list[int]): Up to a few packed outputs that were hit twice
+    scalarMismatches (int): Sampled inputs where the batched operation and 
+        the original scalar function disagree
+    '''
+    name:        str
+    n:           int
+    states:      int
+    collisions:  int
+    auxFailures: int
+    examples:    list
+    scalarMismatches: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.collisions == 0 and self.auxFailures == 0 
+            and self.scalarMismatches == 0
+        )
+
+
+def _registerType(n: int):
+    '''
+    Narrowest integer dtype RegisterFile accepts for n bit registers.
+    '''
+    for dtype in (np.int16, np.int32):
+        if n <= np.iinfo(dtype).bits-2:
+            return dtype
+    return np.int64
+
+
+def _scalarMismatches(
+        reference: Callable[..., tuple], inputs: list[np.ndarray], 
+        outputs: list[np.ndarray], samples: int,
+    ) -> int:
+    '''
+    Runs the scalar reference on `samples` evenly spread inputs and counts
+    those whose outputs differ from the batched ones.
+    '''
+    if reference is None or samples <= 0:
+        return 0
+    picks = np.unique(np.linspace(0, len(inputs[0])-1, samples).astype(np.int64))
+    return sum(
+        tuple(reference(*(int(v[i]) for v in inputs))) 
+        != tuple(int(v[i]) for v in outputs)
+        for i in picks
+    )
+
+
+def checkBijection(
+        name: str, n: int, registers: int,
+        operation: Callable[[list[np.ndarray]], tuple[list[np.ndarray], int]],
+        chunk: int = 1<<22, maxExamples: int = 8, 
+        reference: Callable[..., tuple] = None, samples: int = 16,
+    ) -> ReversibilityReport:
+    '''
+    Enumerates every state of `registers` n bit registers, applies the 
+    operation and checks no two states reach the same output, using a 
+    bitset with one bit per state.
+
+    name       (str): Operation checked
+    n          (int): Number of bits per register
+    registers  (int): Number of registers
+    operation (Callable): Maps the list of input registers to the list of
+        output registers and the number of auxiliary restoration failures
+    chunk      (int): Number of states evaluated at once
+    maxExamples (int): Number of colliding outputs to report
+    reference (Callable): Original scalar function, takes the register 
+        values of one input and returns its output registers. It is run on
+        `samples` inputs of every chunk to cross-check the batched operation
+    samples    (int): Number of inputs per chunk cross-checked
+
+    return (ReversibilityReport): The result
+    '''
+    bits      = n*registers
+    states    = 1<<bits
+    mask      = (1<<n)-1
+    occupancy = np.zeros(max(1, states>>3), dtype=np.uint8)
+
+    collisions, auxFailures, examples, mismatches = 0, 0, [], 0
+    for start in range(0, states, chunk):
+        index = np.arange(start, min(start+chunk, states), dtype=np.int64)
+        inputs = [(index>>(n*k)) & mask for k in range(registers)]
+
+        outputs, failures = operation(inputs)
+        auxFailures += failures
+        mismatches  += _scalarMismatches(reference, inputs, outputs, samples)
+
+        packed = np.zeros_like(index)
+        for k, output in enumerate(outputs):
+            packed |= (np.asarray(output, dtype=np.int64) & mask) << (n*k)
+        packed.sort()
+
+        byte = packed>>3
+        bit  = (np.uint8(1) << (packed&7).astype(np.uint8))
+        seen = (occupancy[byte] & bit) != 0
+        dup  = np.concatenate(([False], packed[1:] == packed[:-1]))
+        hit  = seen | dup
+
+        if np.any(hit):
+            collisions += int(np.sum(hit))
+            examples.extend(packed[hit][:maxExamples-len(examples)].tolist())
+
+        first = np.flatnonzero(np.concatenate(([True], byte[1:] != byte[:-1])))
+        occupancy[byte[first]] |= np.bitwise_or.reduceat(bit, first)
+
+    return ReversibilityReport(
+        name, n, states, collisions, auxFailures, examples, mismatches
+    )
+
+
+def checkAdd(
+        n: int, shift: int, negativeY: bool = False, chunk: int = 1<<22
+    ) -> ReversibilityReport:
+    '''
+    Checks the batched add (FullPrototypeClassical.addBatch, x += ±y>>shift)
+    is a bijection of the 2^(2n) (x, y) states and that y is left unchanged,
+    and cross-checks it against ShiftAdd.add on a sample of every chunk.
+    '''
+    from ShiftAdd import add
+
+    def operation(inputs):
+        x, y = inputs
+        newX, newY = addBatch(x, y, shift, n, negativeY)
+        return [newX, newY], int(np.sum(newY != y))
+
+    def reference(x: int, y: int) -> tuple[int, int]:
+        return add(x, y, shift, n, negativeY)
+
+    return checkBijection(
+        f"add(shift={shift}, negativeY={negativeY})", n, 2, operation, chunk,
+        reference=reference,
+    )
+
+
+def _multRegisters(
+        n: int, m: int, x: np.ndarray, aux_1, aux_2: np.ndarray
+    ) -> np.ndarray:
+    '''
+    RegisterFile.mult on a batch, in the narrowest dtype that fits.
+
+    return (np.ndarray): Output x, aux_1 and aux_2, shape (3, batch)
+    '''
+    registers = RegisterFile(n, len(x), _registerType(n))
+    registers.load(X, x)
+    registers.load(AUX_1, aux_1)
+    registers.load(AUX_2, aux_2)
+    registers.mult(X, m)
+
+    return registers.regs[[X, AUX_1, AUX_2]]
+
+
+def _multReference(n: int, m: int) -> Callable[..., tuple]:
+    from Mult import multImproved
+
+    def reference(x: int, aux_1: int, aux_2: int) -> tuple[int, int, int]:
+        return multImproved(x, aux_1, aux_2, n, m, modulo=True)
+
+    return reference
+
+
+@cache
+def _sliceInputs(n: int) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Every (x, aux_2) pair of n bit registers, in the RegisterFile dtype.
+    '''
+    index = np.arange(1<<(2*n), dtype=np.int64)
+    dtype = _registerType(n)
+    return (index & ((1<<n)-1)).astype(dtype), (index>>n).astype(dtype)
+
+
+def _multSlice(
+        n: int, m: int, aux_1: int, samples: int, maxExamples: int
+    ) -> tuple[int, int, int, list[int]]:
+    '''
+    Checks multImproved on the 2^(2n) (x, aux_2) states with one aux_1 
+    value, counting outputs in an array of 2^(2n) counters.
+
+    return (tuple[int, int, int, list[int]]): collisions, aux_1 
+        restoration failures, scalar mismatches and colliding outputs, 
+        packed like checkBijection packs them
+    '''
+    states   = 1<<(2*n)
+    mask     = (1<<n)-1
+    x, aux_2 = _sliceInputs(n)
+
+    newX, newAux_1, newAux_2 = _multRegisters(n, m, x, aux_1, aux_2)
+    failures = int(np.count_nonzero(newAux_1 != aux_1))
+    packed   = newAux_2.astype(_registerType(2*n))
+    packed <<= n
+    packed  |= newX
+    counts   = np.bincount(packed, minlength=states)
+    collisions = states - int(np.count_nonzero(counts))
+
+    examples = []
+    if collisions:
+        hit      = np.flatnonzero(counts > 1)[:maxExamples]
+        examples = ((hit & mask) | (aux_1<<n) | ((hit>>n)<<(2*n))).tolist()
+
+    mismatches = _scalarMismatches(
+        _multReference(n, m), [x, np.broadcast_to(aux_1, x.shape), aux_2], 
+        [newX, newAux_1, newAux_2], samples,
+    )
+
+    return collisions, failures, mismatches, examples
+
+
+def checkMultImproved(
+        n: int, m: int, processes: int = None, samples: int = 4, 
+        maxExamples: int = 8,
+    ) -> ReversibilityReport:
+    '''
+    Checks the batched multImproved (RegisterFile.mult, the path every 
+    emulator uses) is a bijection of the 2^(3n) (x, aux_1, aux_2) states 
+    and that aux_1 is always restored, and cross-checks it against 
+    Mult.multImproved(modulo=True) on `samples` inputs per aux_1 value.
+
+    While aux_1 is restored the operation never mixes aux_1 values, so each 
+    of the 2^n aux_1 slices is checked on its own, spread over a process 
+    pool. If aux_1 is ever changed the slices are no longer independent and
+    the whole space is checked at once with checkBijection instead.
+
+    n           (int): Number of bits per register
+    m           (int): x is multiplied by 1+2^(-m)
+    processes   (int): Pool size, every core by default, 1 runs in process
+    samples     (int): Inputs cross-checked per aux_1 value
+    maxExamples (int): Number of colliding outputs to report
+
+    return (ReversibilityReport): The result
+    '''
+    name      = f"multImproved(m={m})"
+    processes = processes or os.cpu_count()
+    arguments = (
+        repeat(n), repeat(m), range(1<<n), repeat(samples), 
+        repeat(maxExamples)
+    )
+    if processes == 1:
+        slices = list(map(_multSlice, *arguments))
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            slices = list(pool.map(
+                _multSlice, *arguments, chunksize=max(1, (1<<n)//(4*processes))
+            ))
+
+    collisions  = sum(result[0] for result in slices)
+    auxFailures = sum(result[1] for result in slices)
+    mismatches  = sum(result[2] for result in slices)
+    examples    = [e for result in slices for e in result[3]][:maxExamples]
+
+    if auxFailures:
+        def operation(inputs):
+            outputs = _multRegisters(n, m, *inputs)
+            return list(outputs), int(np.sum(outputs[1] != inputs[1]))
+
+        report = checkBijection(name, n, 3, operation, maxExamples=maxExamples)
+        return report._replace(scalarMismatches=mismatches)
+
+    return ReversibilityReport(
+        name, n, 1<<(3*n), collisions, auxFailures, examples, mismatches
+    )
+
+
+def main():
+    reports  = [
+        checkAdd(n, shift, negativeY)
+        for n in (4, 8, 10)
+        for shift in range(n+2)
+        for negativeY in (False, True)
+    ]
+    reports += [
+        checkMultImproved(n, m) for n in (3, 5, 7, 10) for m in range(1, 2*n)
+    ]
+
+    for report in reports:
+        print(
+            f"{'ok  ' if report.ok else 'FAIL'} {report.name:<32} n={report.n:<2}"
+            +f" | states={report.states:<10} | {report.collisions=}"
+            +f" | {report.auxFailures=} | {report.scalarMismatches=}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+
+from typing import Iterable, Iterator, Sequence
+
+from Schedule import multSchedule
+
+# A gate is the tuple of qubits it acts on, the last one being the target:
+#   (t,) is X, (c, t) is CX and (c1, c2, t) is CCX.
+Gate     = tuple[int, ...]
+Register = Sequence[int]
+
+# Adder used when none is given: "ripple" (shiftAdditionGates, no ancillas)
+# or "lookahead" (lookaheadAdditionGates, log depth). With "lookahead" every
+# call must be given an ancilla register or pass adder="ripple"
+ADDERS: tuple[str, ...] = ("ripple", "lookahead")
+DEFAULT_ADDER: str = "ripple"
+
+
+def layout(n: int, count: int, start: int = 0) -> list[list[int]]:
+    '''
+    Lays out consecutive registers of n qubits, least significant bit first
+    (the same ordering qiskit uses).
+
+    n     (int): Qubits per register
+    count (int): Number of registers
+    start (int): Index of the first qubit
+
+    return (list[list[int]]): Qubit indices of every register
+    '''
+    return [
+        list(range(start+i*n, start+(i+1)*n)) for i in range(count)
+    ]
+
+
+def inverse(gates: Iterable[Gate]) -> list[Gate]:
+    '''
+    Inverse of a gate list. X, CX and CCX are self-inverse so this is the
+    list reversed.
+    '''
+    return list(gates)[::-1]
+
+
+def rshiftGates(
+        inReg: Register, outReg: Register, rshift: int, n: int
+    ) -> Iterator[Gate]:
+    '''
+    Copies inReg right shifted in two's complement into outReg (outReg ^=).
+    Note: shifts larger than n fill outReg with the sign bit, like 
+    ModuloBitShift.bitshift.
+
+    inReg  (Register): Register being copied
+    outReg (Register): Register receiving the copy, usually zero
+    rshift      (int): The amount right shifted, non-negative only
+    n           (int): Number of bits
+
+    return (Iterator[Gate]): The CX gates
+    '''
+    rshift = min(rshift, n)
+    for i in range(n-rshift):
+        yield (inReg[i+rshift], outReg[i])
+    for i in range(n-rshift, n):
+        yield (inReg[n-1], outReg[i])
+
+
+def shiftAdditionGates(
+        xReg: Register, yReg: Register, rsReg: Register, rshift: int = 0
+    ) -> list[Gate]:
+    '''
+    Gate list of the notebook's shiftAdditionGate, adds right shifted y to x 
+    using the ripple adder from:
+        Quantum Addition Circuits and Unbounded Fan-Out
+        Authors: Yasuhiro Takahashi, Seiichiro Tani, Noboru Kunihiro
+
+    xReg   (Register): Register to be added to
+    yReg   (Register): Register which has input
+    rsReg  (Register): Register to hold the bitshifted version of y, zero
+    rshift      (int): The amount right shifted, non-negative only
+
+    return (list[Gate]): The gates, the inverse subtracts instead
+    '''
+    n = min(len(xReg), len(yReg), len(rsReg))
+    prepare = list(rshiftGates(yReg, rsReg, rshift, n))
+    gates   = list(prepare)
+
+    #Step 1
+    for i in range(1, n):
+        gates.append((rsReg[i], xReg[i]))
+    #Step 2
+    for i in range(n-2, 0, -1):
+        gates.append((rsReg[i], rsReg[i+1]))
+    #Step 3
+    for i in range(n-1):
+        gates.append((rsReg[i], xReg[i], rsReg[i+1]))
+    #Step 4
+    for i in range(n-1, 0, -1):
+        gates.append((rsReg[i], xReg[i]))
+        gates.append((rsReg[i-1], xReg[i-1], rsReg[i]))
+    #Step 5
+    for i in range(1, n-1):
+        gates.append((rsReg[i], rsReg[i+1]))
+    #Step 6
+    for i in range(n):
+        gates.append((rsReg[i], xReg[i]))
+
+    gates.extend(inverse(prepare))
+
+    return gates
+
+
+def _signFanOutGates(
+        inReg: Register, outReg: Register, rshift: int, n: int
+    ) -> list[Gate]:
+    '''
+    rshiftGates into a zero outReg, with the sign bit copied in a doubling 
+    tree so the fan-out has depth log(rshift) instead of rshift.
+    '''
+    rshift = min(rshift, n)
+    gates  = [(inReg[i+rshift], outReg[i]) for i in range(n-rshift)]
+    if rshift == 0:
+        return gates
+
+    filled = [n-rshift]
+    gates.append((inReg[n-1], outReg[n-rshift]))
+    while len(filled) < rshift:
+        new = list(range(
+            n-rshift+len(filled), min(n, n-rshift+2*len(filled))
+        ))
+        gates.extend((outReg[f], outReg[i]) for f, i in zip(filled, new))
+        filled.extend(new)
+
+    return gates
+
+
+def _prefixPlan(m: int) -> tuple[list, list, list]:
+    '''
+    Brent-Kung parallel prefix over m positions. Every step (t, j, d) 
+    combines the range ending at j (built at level t-1) with the one ending 
+    at j-d. Returns the up sweep, the down sweep, and the level t >= 1 
+    group propagate nodes (t, j) that are read later and so need an ancilla.
+    '''
+    up, down, levels = [], [], max(1, m-1).bit_length()
+    for t in range(1, levels+1):
+        up += [(t, j, 1<<(t-1)) for j in range((1<<t)-1, m, 1<<t)]
+    for t in range(levels, 0, -1):
+        down += [
+            (t, j, 1<<(t-1)) 
+            for j in range((1<<t)+(1<<(t-1))-1, m, 1<<t)
+        ]
+
+    read  = {(t-1, j) for t, j, d in up+down}
+    read |= {(t-1, j-d) for t, j, d in up}
+    nodes = sorted(node for node in read if node[0] > 0)
+
+    return up, down, nodes
+
+
+def lookaheadAncillaCount(n: int) -> int:
+    '''
+    Number of ancilla qubits lookaheadAdditionGates needs for n bit 
+    registers: a copy of the sum, the propagate and generate bits, and the 
+    group propagate bits of the prefix tree.
+    '''
+    return 3*n-1 + len(_prefixPlan(n-1)[2])
+
+
+def _lookaheadSumGates(
+        aReg: Register, bReg: Register, target: Register, 
+        ancilla: Register, carryIn: bool,
+    ) -> list[Gate]:
+    '''
+    target ^= a+b+carryIn modulo 2^n with a and b unchanged. Carries are 
+    computed with a Brent-Kung prefix tree and uncomputed afterwards, so
+    ancilla[n:] is left at zero.
+    '''
+    n = len(target)
+    up, down, nodes = _prefixPlan(n-1)
+    P      = ancilla[n:2*n]
+    G      = ancilla[2*n:3*n-1]
+    groupP = dict(zip(nodes, ancilla[3*n-1:]))
+
+    def propagate(t: int, j: int) -> int:
+        return P[j] if t == 0 else groupP[(t, j)]
+
+    compute  = [(aReg[i], P[i]) for i in range(n)]
+    compute += [(bReg[i], P[i]) for i in range(n)]
+    compute += [(aReg[i], bReg[i], G[i]) for i in range(n-1)]
+    if carryIn and n > 1:
+        #g_0 and p_0 exclusive so g_0|p_0 = g_0^p_0
+        compute.append((P[0], G[0]))
+    #Generate of a range is zero whenever its propagate is set, so 
+    #G |= P&G' can be done as G ^= P&G'
+    for t, j, d in up:
+        compute.append((propagate(t-1, j), G[j-d], G[j]))
+        if (t, j) in groupP:
+            compute.append(
+                (propagate(t-1, j), propagate(t-1, j-d), groupP[(t, j)])
+            )
+    for t, j, d in down:
+        compute.append((propagate(t-1, j), G[j-d], G[j]))
+
+    gates  = [(P[i], target[i]) for i in range(n)]
+    gates += [(G[i-1], target[i]) for i in range(1, n)]
+    if carryIn:
+        gates.append((target[0],))
+
+    return compute + gates + inverse(compute)
+
+
+def lookaheadAdditionGates(
+        xReg: Register, yReg: Register, rsReg: Register, ancReg: Register,
+        rshift: int = 0
+    ) -> list[Gate]:
+    '''
+    Same operation as shiftAdditionGates (x += y>>rshift in two's 
+    complement) in O(log n) depth, using lookaheadAncillaCount(n) zero 
+    ancillas. The sum is computed out of place, z ^= x+rs, then 
+    x ^= z-rs clears x, and the two registers are swapped.
+
+    xReg   (Register): Register to be added to
+    yReg   (Register): Register which has input
+    rsReg  (Register): Register to hold the bitshifted version of y, zero
+    ancReg (Register): Ancilla qubits, zero, returned to zero
+    rshift      (int): The amount right shifted, non-negative only
+
+    return (list[Gate]): The gates, the inverse subtracts instead
+    '''
+    n = min(len(xReg), len(yReg), len(rsReg))
+    if len(ancReg) < lookaheadAncillaCount(n):
+        raise ValueError(
+            f"{len(ancReg)} ancillas given, {lookaheadAncillaCount(n)} needed"
+        )
+    zReg    = ancReg[:n]
+    prepare = _signFanOutGates(yReg, rsReg, rshift, n)
+    flip    = [(rsReg[i],) for i in range(n)]
+
+    gates  = list(prepare)
+    gates += _lookaheadSumGates(xReg, rsReg, zReg, ancReg, False)
+    gates += flip
+    gates += _lookaheadSumGates(zReg, rsReg, xReg, ancReg, True)
+    gates += flip
+    gates += [(zReg[i], xReg[i]) for i in range(n)]
+    gates += [(xReg[i], zReg[i]) for i in range(n)]
+    gates += inverse(prepare)
+
+    return gates
+
+
+def resolveAdder(adder: str = None, ancReg: Register = None) -> str:
+    '''
+    Adder used by a call: adder if given, otherwise DEFAULT_ADDER. Raises
+    ValueError for the lookahead adder when no ancilla register was given.
+
+    adder     (str): Requested adder, one of ADDERS or None
+    ancReg (Register): Ancillas available to the call, if any
+
+    return (str): The adder
+    '''
+    if adder is None:
+        adder = DEFAULT_ADDER
+    if adder not in ADDERS:
+        raise ValueError(f"Unknown adder {adder!r}, expected one of {ADDERS}")
+    if adder == "lookahead" and ancReg is None:
+        raise ValueError(
+            "The lookahead adder needs an ancilla register of "
+            "lookaheadAncillaCount(n) qubits, pass ancReg or adder=\"ripple\""
+        )
+    return adder
+
+
+def additionGates(
+        xReg: Register, yReg: Register, rsReg: Register, rshift: int = 0,
+        adder: str = None, ancReg: Register = None
+    ) -> list[Gate]:
+    '''
+    Shift-addition with the adder chosen by resolveAdder. The lookahead 
+    adder needs ancReg, see lookaheadAdditionGates.
+    '''
+    if resolveAdder(adder, ancReg) == "lookahead":
+        return lookaheadAdditionGates(xReg, yReg, rsReg, ancReg, rshift)
+    return shiftAdditionGates(xReg, yReg, rsReg, rshift)
+
+
+def multGates(
+        xReg: Register, aux1Reg: Register, aux2Reg: Register, rsReg: Register,
+        n: int, m: int, adder: str = None, ancReg: Register = None,
+    ) -> Iterator[Gate]:
+    '''
+    Gate list of the notebook's multGate, in place multiplication by 
+    1+2^(-m), the same operation as Mult.multImproved in modulo mode.
+
+    xReg     (Register): Register being multiplied
+    aux1Reg  (Register): First auxiliary register
+    aux2Reg  (Register): Second auxiliary register
+    rsReg    (Register): Auxiliary register for the additions, zero
+    n             (int): Number of bits representing xReg
+    m             (int): xReg is multiplied by 1+2^(-m)
+    adder         (str): Adder used, one of ADDERS, see resolveAdder if None
+    ancReg   (Register): Ancillas for the lookahead adder, zero
+
+    return (Iterator[Gate]): The gates
+    '''
+    schedule = multSchedule(n, m)
+
+    def add(target, source, shift):
+        return additionGates(target, source, rsReg, shift, adder, ancReg)
+
+    def ladder(steps):
+        for step in steps:
+            target, source = (
+                (aux1Reg, xReg) if step.intoAux else (xReg, aux1Reg)
+            )
+            gates = add(target, source, step.shift)
+            yield from (inverse(gates) if step.negative else gates)
+
+    yield from add(aux2Reg, xReg, 0)
+    yield from add(xReg, aux2Reg, m)
+    yield from add(aux1Reg, xReg, 0)
+    yield from ladder(schedule.forward)
+    yield from inverse(add(aux2Reg, aux1Reg, 0))
+    yield from ladder(schedule.backward)
+    yield from inverse(add(aux1Reg, xReg, 0))
+
+
+def fromQiskit(circuit) -> list[Gate]:
+    '''
+    Flattens a qiskit circuit made of X/CX/CCX gates (possibly nested in 
+    custom gates) into a gate list.
+
+    circuit (QuantumCircuit): Circuit to flatten
+
+    return (list[Gate]): The gates, qubits indexed by position in circuit
+    '''
+    def flatten(definition, qubits):
+        for instruction in definition.data:
+            name   = instruction.operation.name
+            inside = [
+                qubits[definition.find_bit(qubit).index]
+                for qubit in instruction.qubits
+            ]
+            if name in ("x", "cx", "ccx"):
+                yield tuple(inside)
+            elif instruction.operation.definition is not None:
+                yield from flatten(instruction.operation.definition, inside)
+            else:
+                raise ValueError(f"Gate {name!r} is not a permutation gate")
+
+    return list(flatten(circuit, list(range(circuit.num_qubits))))
+
+
+def decisionGates(
+        xReg: Register, yReg: Register, tReg: Register, rsReg: Register,
+        scratch: int, decision: int, adder: str = None, 
+        ancReg: Register = None,
+    ) -> Iterator[Gate]:
+    '''
+    Computes the CORDIC decision bit of FullPrototypeClassical.qasinModuloCORDIC
+        d = isneg(x) != isneg(t - (0 if isneg(x) else y))
+    into the decision qubit (d ^=). The scratch qubit must be zero and is 
+    returned to zero.
+
+    xReg, yReg, tReg (Register): CORDIC registers, left unchanged
+    rsReg            (Register): Auxiliary register for the additions, zero
+    scratch               (int): Clean ancilla qubit
+    decision              (int): Qubit receiving d
+    adder                 (str): Adder used, see resolveAdder
+    ancReg           (Register): Ancillas for the lookahead adder, zero
+
+    return (Iterator[Gate]): The gates
+    '''
+    n         = len(tReg)
+    xSign     = xReg[n-1]
+    tSign     = tReg[n-1]
+    add       = additionGates(tReg, yReg, rsReg, 0, adder, ancReg)
+    signOfTmY = inverse(add) + [(tSign, scratch)] + add
+
+    yield from signOfTmY                    # scratch = isneg(t-y)
+    yield (tSign, scratch)                  # scratch = isneg(t-y)^isneg(t)
+    yield (xSign, scratch, decision)        # d = isneg(x)&scratch
+    yield (tSign, scratch)                  # scratch = isneg(t-y)
+    yield (scratch, decision)
+    yield (xSign, decision)
+    yield from signOfTmY                    # scratch = 0
+
+
+def controlledSwapGates(
+        control: int, aReg: Register, bReg: Register
+    ) -> Iterator[Gate]:
+    '''
+    Swaps two registers when the control qubit is set (one Fredkin gate per
+    bit).
+    '''
+    for a, b in zip(aReg, bReg):
+        yield (b, a)
+        yield (control, a, b)
+        yield (b, a)
+
+
+def cordicLayout(n_bits: int, adder: str = None) -> dict[str, list[int]]:
+    '''
+    Qubit layout of the arcsin CORDIC circuit. x, y, t, aux_1, aux_2 and rs 
+    are n_bits+2 qubit registers, e is one scratch qubit and d holds one 
+    decision bit per iteration. With the lookahead adder anc holds its 
+    lookaheadAncillaCount(n_bits+2) ancillas.
+
+    n_bits (int): Number of bits used to describe t
+    adder  (str): Adder the circuit uses, DEFAULT_ADDER if None
+
+    return (dict[str, list[int]]): Qubits of every register
+    '''
+    n = n_bits+2
+    registers = dict(zip(
+        ("x", "y", "t", "aux_1", "aux_2", "rs"), layout(n, 6)
+    ))
+    registers["e"] = [6*n]
+    registers["d"] = list(range(6*n+1, 6*n+n))
+    adder = DEFAULT_ADDER if adder is None else adder
+    if adder not in ADDERS:
+        raise ValueError(f"Unknown adder {adder!r}, expected one of {ADDERS}")
+    if adder == "lookahead":
+        registers["anc"] = list(range(7*n, 7*n+lookaheadAncillaCount(n)))
+
+    return registers
+
+
+def cordicIterationGates(
+        registers: dict[str, list[int]], i: int
+    ) -> Iterator[Gate]:
+    '''
+    Gates of iteration i of the arcsin CORDIC, see cordicGates. The 
+    lookahead adder is used when the layout has an anc register.
+    '''
+    x, y, t    = registers["x"], registers["y"], registers["t"]
+    aux1, aux2 = registers["aux_1"], registers["aux_2"]
+    rs, d      = registers["rs"], registers["d"][i-1]
+    anc        = registers.get("anc")
+    adder      = "ripple" if anc is None else "lookahead"
+    n          = len(x)
+
+    def add(target, source, shift):
+        return additionGates(target, source, rs, shift, adder, anc)
+
+    yield from decisionGates(x, y, t, rs, registers["e"][0], d, adder, anc)
+    yield from controlledSwapGates(d, x, y)
+    for _ in range(2):
+        yield from inverse(add(x, y, i))
+        yield from multGates(y, aux1, aux2, rs, n, 2*i, adder, anc)
+        yield from add(y, x, i)
+    yield from controlledSwapGates(d, x, y)
+    yield from multGates(t, aux1, aux2, rs, n, 2*i, adder, anc)
+
+
+def cordicGates(n_bits: int, adder: str = None) -> Iterator[Gate]:
+    '''
+    Gates of the whole arcsin CORDIC (FullPrototypeClassical.qasinModuloCORDIC)
+    on the cordicLayout qubits. t is an input, every other register starts at
+    zero. The decision bits are left in d, theta is the sum over iterations i
+    of 2*(-1 if d[i-1] else 1)*arctan(2^(-i)).
+
+    n_bits (int): Number of bits used to describe t
+    adder  (str): Adder used, DEFAULT_ADDER if None, see cordicLayout
+
+    return (Iterator[Gate]): The gates, generated lazily
+    '''
+    registers = cordicLayout(n_bits, adder)
+    for k in range(n_bits):
+        yield (registers["x"][k],)
+    for i in range(1, n_bits+2):
+        yield from cordicIterationGates(registers, i)
@@ -0,0 +1,126 @@
+
+import numpy as np
+from functools import cache
+from typing import NamedTuple
+
+
+class LadderStep(NamedTuple):
+    '''
+    One addition of the Fibonacci multiplication ladder.
+
+    intoAux  (bool): If true aux_1 += ±x>>shift, otherwise x += ±aux_1>>shift
+    shift     (int): Right bitshift applied to the added register
+    negative (bool): Subtracts instead of adding when true
+    '''
+    intoAux:  bool
+    shift:    int
+    negative: bool
+
+
+class MultSchedule(NamedTuple):
+    '''
+    Precomputed steps of the multiplication of x by 1+2^(-m) on n bits.
+
+    n          (int): Number of bits representing x
+    m          (int): x is multiplied by 1+2^(-m)
+    forward  (tuple[LadderStep, ...]): Ladder run before cleaning aux_2
+    backward (tuple[LadderStep, ...]): Inverse ladder run afterwards
+    '''
+    n:        int
+    m:        int
+    forward:  tuple[LadderStep, ...]
+    backward: tuple[LadderStep, ...]
+
+
+@cache
+def fib(i: int) -> int:
+    '''
+    Fibonacci numbers { 1,1,2,3,5,8,13, ... }, computed exactly with integers.
+
+    i (int): Index of Fibonacci number
+
+    return (int): i^th Fibonacci number
+    '''
+    a, b = 1, 1
+    for _ in range(i):
+        a, b = b, a+b
+    return a
+
+
+def ladderLength(n: int, m: int) -> int:
+    '''
+    Number of steps in the Fibonacci ladder, 1+2*ceil(log_{1+sqrt(5)}(n/m)).
+
+    n (int): Number of bits representing x
+    m (int): x is multiplied by 1+2^(-m)
+
+    return (int): Ladder length, can be non-positive when m > n
+    '''
+    return int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))
+
+
+@cache
+def multSchedule(n: int, m: int) -> MultSchedule:
+    '''
+    Builds (once per (n, m)) the ordered ladder steps used by mult.
+
+    n (int): Number of bits representing x
+    m (int): x is multiplied by 1+2^(-m)
+
+    return (MultSchedule): The forward and backward ladders
+    '''
+    forward = tuple(
+        LadderStep(intoAux=(i%2==1), shift=m*fib(i), negative=(fib(i)%2==1))
+        for i in range(ladderLength(n, m))
+    )
+    backward = tuple(
+        LadderStep(step.intoAux, step.shift, not step.negative)
+        for step in reversed(forward)
+    )
+
+    return MultSchedule(n, m, forward, backward)
+
+
+@cache
+def arctanTable(n: int) -> tuple[float, ...]:
+    '''
+    CORDIC rotation angles arctan(2^(-i)) for i in [0, n).
+
+    n (int): Number of angles
+
+    return (tuple[float, ...]): Angle for every iteration index
+    '''
+    return tuple(np.arctan(2**(-i)) for i in range(n))
+
+
+@cache
+def cordicGain(n: int) -> float:
+    '''
+    Growth of the x, y and t registers over a CORDIC run, each iteration 
+    multiplies them by 1+2^(-2i) for i in [1, n).
+
+    n (int): Number of bits per register
+
+    return (float): prod_i (1+2^(-2i))
+    '''
+    return float(np.prod([1+2.0**(-2*i) for i in range(1, n)]))
+
+
+def iterationsForError(n: int, targetError: float) -> int:
+    '''
+    Number of CORDIC iterations needed so that the angle still left to 
+    rotate, sum_{i>k} 2*arctan(2^(-i)), is below targetError. Never more 
+    than the n-1 iterations of a full run.
+
+    n           (int): Number of bits per register
+    targetError (float): Acceptable angular error in radians
+
+    return (int): Number of iterations k
+    '''
+    atan = arctanTable(n)
+    tail = 0.
+    for k in range(n-1, 0, -1):
+        tail += 2*atan[k]
+        if tail >= targetError:
+            return k
+    return 0
@@ -1,7 +1,8 @@
 
 import numpy as np
-import bitstring as bs
-from bitstring import BitArray
+
+from PermutationSim import fromBitPlanes, toBitPlanes
+from ReversibleGates import layout
 
 def binaryToStr(x: int, n: int = 8) -> str:
     '''
@@ -18,7 +19,10 @@ def shiftAdd(
     ) -> tuple[int, int, int]:
     """
     Adds rightshifted y to x
+    Note: bit by bit prototype, see rippleCarryAdd for the batched version
     """
+    from bitstring import BitArray
+
     x_b = BitArray(int=x, length=n)
     y_b = BitArray(int=y, length=n)
     c_b = BitArray(int=c, length=n)
@@ -45,7 +49,104 @@ def shiftAdd(
 
     return x_b.int, y_b.int, c_b.int
 
+def rippleCarryAddPlanes(
+        planes: np.ndarray, x: list[int], y: list[int], c: list[int], 
+        shift: int = 0, negativeY: bool = False
+    ) -> np.ndarray:
+    '''
+    Ripple carry addition x += ±(y>>shift) on bit planes, in place. Each 
+    step evaluates one bit of the carry chain for every packed state with 
+    a handful of uint64 operations. The carry out of bit i is xored into 
+    c[i], so c returns to its input value only if it is uncomputed later.
+    Note: y>>shift copies the most significant bit left, like ShiftAdd.add,
+    and subtraction adds ~(y>>shift) with an incoming carry of one.
+
+    planes (np.ndarray): Bit planes from PermutationSim.toBitPlanes
+    x       (list[int]): Planes of the register being added to
+    y       (list[int]): Planes of the register being added
+    c       (list[int]): Planes of the carry register
+    shift         (int): Bitshift applied to y before addition
+    negativeY    (bool): Subtracts instead when set to True
+
+    return (np.ndarray): planes, updated
+    '''
+    n     = len(x)
+    carry = np.full(planes.shape[1], ~np.uint64(0) if negativeY else 0, 
+        dtype=np.uint64)
+    for i in range(n):
+        operand = planes[y[min(i+shift, n-1)]]
+        if negativeY:
+            operand = ~operand
+        half = planes[x[i]] ^ operand
+
+        carryOut     = (planes[x[i]] & operand) | (carry & half)
+        planes[x[i]] = half ^ carry
+        planes[c[i]] ^= carryOut
+        carry        = carryOut
+
+    return planes
+
+
+def rippleCarryAdd(
+        x: np.ndarray, y: np.ndarray, c: np.ndarray, shift: int = 0, 
+        n: int = 8, negativeY: bool = False
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Batched gate level version of shiftAdd, simulates the carry chain for 
+    every (x, y, c) input at once on bit planes, 64 inputs per word.
+    With c = 0 the carry register matches shiftAdd.
+
+    x (np.ndarray): Numbers to be added to
+    y (np.ndarray): Numbers adding into x
+    c (np.ndarray): Carry registers
+    shift   (int): Bitshift applied to y before addition
+    n       (int): Number of bits
+    negativeY (bool): Subtracts instead when set to True
+
+    return (tuple[np.ndarray, np.ndarray, np.ndarray]): x, y and c modulo 
+        2^n
+    '''
+    mask      = (1<<n)-1
+    values    = [np.asarray(v, dtype=np.int64) & mask for v in (x, y, c)]
+    registers = layout(n, 3)
+    planes    = toBitPlanes(values, registers, 3*n)
+
+    rippleCarryAddPlanes(planes, *registers, shift, negativeY)
+
+    return tuple(
+        fromBitPlanes(planes, register, len(values[0])) 
+        for register in registers
+    )
+
+
+def checkRippleCarryAdd(n: int) -> int:
+    '''
+    Runs rippleCarryAdd on every (x, y) pair, every shift and both signs 
+    and compares x with FullPrototypeClassical.addBatch.
+
+    n (int): Number of bits
+
+    return (int): Number of mismatching outputs, including y changing
+    '''
+    from FullPrototypeClassical import addBatch
+
+    x, y   = np.divmod(np.arange(1<<(2*n), dtype=np.int64), 1<<n)
+    errors = 0
+    for shift in range(n+1):
+        for negativeY in (False, True):
+            newX, newY, _ = rippleCarryAdd(
+                x, y, np.zeros_like(x), shift, n, negativeY
+            )
+            expected = addBatch(x, y, shift, n, negativeY)[0]
+            errors  += int(np.sum((newX != expected) | (newY != y)))
+
+    return errors
+
+
 def main():
+    for n in range(2, 9):
+        print(f"{n=} | ripple carry adder errors={checkRippleCarryAdd(n)}")
+
     num_bits  = 5
     num_tests = 4
 
@@ -59,9 +160,10 @@ def main():
         c_in  = 0
         shift = 0
 
-        x_out, y_out, c_out = shiftAdd(
-            x=x_in, y=y_in, c=c_in, shift=shift, n=num_bits
-        )
+        x_out, y_out, c_out = (int(v[0]) for v in rippleCarryAdd(
+            x=[x_in], y=[y_in], c=[c_in], shift=shift, n=num_bits
+        ))
+        x_out -= (1<<num_bits) if x_out & (1<<(num_bits-1)) else 0
 
         expected = int(x_in+y_in/(2**shift))
         signed_expected = expected \
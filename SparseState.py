@@ -0,0 +1,184 @@
+
+import numpy as np
+from typing import Iterable, Sequence
+
+from PermutationSim import fromBitPlanes, simulate, toBitPlanes
+from ReversibleGates import Gate, Register, cordicGates, cordicLayout
+
+
+class SparseState:
+    '''
+    Superposition of K basis states, stored as the bit planes of the K 
+    basis indices (see PermutationSim.toBitPlanes) and their amplitudes. 
+    X, CX and CCX only permute basis states, so a gate updates the planes 
+    of every term at once and the amplitudes never change: the cost scales
+    with K times the number of gates, not with 2^n_qubits.
+
+    n_qubits   (int): Number of qubits
+    planes     (np.ndarray): uint64 bit planes, shape (n_qubits, ceil(K/64))
+    amplitudes (np.ndarray): complex amplitude of every term
+    '''
+    __slots__ = ("n_qubits", "planes", "amplitudes")
+
+    def __init__(
+            self, n_qubits: int, planes: np.ndarray, amplitudes: np.ndarray
+        ):
+        self.n_qubits   = n_qubits
+        self.planes     = planes
+        self.amplitudes = np.asarray(amplitudes, dtype=np.complex128)
+
+    @classmethod
+    def fromRegisters(
+            cls, values: Sequence[np.ndarray], registers: Sequence[Register],
+            n_qubits: int, amplitudes: np.ndarray = None,
+        ) -> "SparseState":
+        '''
+        State with one term per entry of values, every other qubit zero.
+
+        values    (Sequence[np.ndarray]): Value of every register per term
+        registers   (Sequence[Register]): Qubits of every register
+        n_qubits                   (int): Total number of qubits
+        amplitudes          (np.ndarray): Amplitude of every term, uniform
+            by default. The terms should be distinct basis states.
+        '''
+        terms = len(values[0])
+        if amplitudes is None:
+            amplitudes = np.full(terms, 1/np.sqrt(terms))
+
+        return cls(
+            n_qubits, toBitPlanes(values, registers, n_qubits), amplitudes
+        )
+
+    @classmethod
+    def fromDict(
+            cls, amplitudes: dict[int, complex], n_qubits: int
+        ) -> "SparseState":
+        '''
+        State from a map of basis index to amplitude, indices may be wider 
+        than 64 bits.
+        '''
+        indices = list(amplitudes)
+        chunks  = [
+            np.array([(index>>k) & ((1<<62)-1) for index in indices], 
+                dtype=np.int64)
+            for k in range(0, n_qubits, 62)
+        ]
+        registers = [
+            list(range(k, min(k+62, n_qubits))) for k in range(0, n_qubits, 62)
+        ]
+
+        return cls.fromRegisters(
+            chunks, registers, n_qubits, list(amplitudes.values())
+        )
+
+    def __len__(self) -> int:
+        return len(self.amplitudes)
+
+    def apply(self, gates: Iterable[Gate]) -> "SparseState":
+        '''
+        Applies X/CX/CCX gates to every term, in place.
+        '''
+        simulate(gates, self.planes)
+        return self
+
+    def register(self, register: Register) -> np.ndarray:
+        '''
+        Value of a register (at most 63 qubits) in every term.
+        '''
+        return fromBitPlanes(self.planes, register, len(self))
+
+    def marginal(self, register: Register) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Distribution of a register, like StateDecode.decodeRegister.
+
+        return (tuple[np.ndarray, np.ndarray]):
+            values        (np.ndarray): Distinct values of the register
+            probabilities (np.ndarray): Probability of measuring each value
+        '''
+        values, inverse = np.unique(self.register(register), return_inverse=True)
+        return values, np.bincount(
+            inverse, weights=np.abs(self.amplitudes)**2, minlength=len(values)
+        )
+
+    def toDict(self) -> dict[int, complex]:
+        '''
+        Map of basis index to amplitude, indices as Python ints.
+        '''
+        indices = [0]*len(self)
+        for k in range(0, self.n_qubits, 62):
+            chunk = self.register(range(k, min(k+62, self.n_qubits)))
+            indices = [
+                index | (int(value)<<k) for index, value in zip(indices, chunk)
+            ]
+
+        return dict(zip(indices, self.amplitudes.tolist()))
+
+
+def checkSparseState(n: int, m: int, terms: int = 16) -> float:
+    '''
+    Runs a random superposition through multGate with qiskit's Statevector 
+    and through SparseState with multGates, and compares the amplitudes.
+
+    n     (int): Number of bits per register
+    m     (int): x is multiplied by 1+2^(-m)
+    terms (int): Number of basis states in the superposition
+
+    return (float): Largest amplitude difference
+    '''
+    from qiskit import QuantumCircuit, QuantumRegister
+    from qiskit.quantum_info import Statevector
+
+    from QuantumGates import multGate
+    from ReversibleGates import layout, multGates
+
+    rng     = np.random.default_rng(n*1000+m)
+    indices = rng.choice(1<<(3*n), size=terms, replace=False)
+    amplitudes  = rng.normal(size=terms) + 1j*rng.normal(size=terms)
+    amplitudes /= np.linalg.norm(amplitudes)
+
+    dense = np.zeros(1<<(4*n), dtype=np.complex128)
+    dense[indices] = amplitudes
+    registers = [QuantumRegister(n) for _ in range(4)]
+    circuit   = QuantumCircuit(*registers)
+    circuit.append(multGate(*registers, n=n, m=m, adder="ripple"), circuit.qubits)
+    dense = Statevector(dense).evolve(circuit).data
+
+    state = SparseState.fromDict(
+        dict(zip(indices.tolist(), amplitudes)), 4*n
+    ).apply(multGates(*layout(n, 4), n=n, m=m, adder="ripple"))
+    sparse = np.zeros_like(dense)
+    for index, amplitude in state.toDict().items():
+        sparse[index] = amplitude
+
+    return float(np.max(np.abs(dense-sparse)))
+
+
+def main():
+    from Schedule import arctanTable
+
+    n_bits, terms = 16, 1024
+    n         = n_bits+2
+    registers = cordicLayout(n_bits)
+    names     = list(registers)
+    n_qubits  = sum(len(qubits) for qubits in registers.values())
+
+    t     = np.linspace(-(1<<n_bits), 1<<n_bits, terms).astype(np.int64)
+    state = SparseState.fromRegisters(
+        [t%(1<<n) if name == "t" else np.zeros_like(t) for name in names],
+        [registers[name] for name in names], n_qubits,
+    ).apply(cordicGates(n_bits))
+
+    d, probabilities = state.marginal(registers["d"])
+    atan  = arctanTable(n)
+    theta = sum(
+        2*np.where((d>>(i-1))&1, -1, 1)*atan[i] for i in range(1, n)
+    )
+    perTerm = theta[np.searchsorted(d, state.register(registers["d"]))]
+    error   = np.max(np.abs(perTerm - np.arcsin(t/(1<<n_bits))))
+
+    print(f"{n_qubits=} | {terms=} | distinct decision strings={len(d)}")
+    print(f"mean theta          = {np.sum(theta*probabilities):.6f}")
+    print(f"max |theta-arcsin|  = {error:.6f}")
+
+if __name__ == "__main__":
+    main()
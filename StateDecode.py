@@ -0,0 +1,54 @@
+
+import numpy as np
+
+
+def decodeState(
+        state, n: int, n_registers: int = None, tol: float = 1e-12
+    ) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Splits every basis term of a statevector into register values, reading
+    the nonzero amplitude indices straight from the data array. Registers
+    are n qubits each, the first register holding the least significant 
+    qubits (qiskit ordering).
+
+    state (Statevector | np.ndarray): State, anything with a .data array or
+        the amplitude array itself
+    n           (int): Number of qubits per register
+    n_registers (int): Number of registers, defaults to all of the qubits
+    tol       (float): Amplitudes with magnitude at most tol are dropped
+
+    return (tuple[np.ndarray, np.ndarray]):
+        values     (np.ndarray): int64 array of shape (terms, n_registers)
+        amplitudes (np.ndarray): complex amplitude of each term
+    '''
+    data     = np.asarray(getattr(state, "data", state)).ravel()
+    n_qubits = int(len(data)).bit_length()-1
+    if n_registers is None:
+        n_registers = n_qubits//n
+
+    indices = np.flatnonzero(np.abs(data) > tol).astype(np.int64)
+    shifts  = n*np.arange(n_registers, dtype=np.int64)
+    values  = (indices[:, None]>>shifts) & ((1<<n)-1)
+
+    return values, data[indices]
+
+
+def decodeRegister(
+        state, register: int, n: int, tol: float = 1e-12
+    ) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Marginal distribution of one register of a statevector.
+
+    state (Statevector | np.ndarray): State to decode
+    register (int): Index of the register
+    n        (int): Number of qubits per register
+    tol    (float): Amplitudes with magnitude at most tol are dropped
+
+    return (tuple[np.ndarray, np.ndarray]):
+        values        (np.ndarray): Distinct values of the register
+        probabilities (np.ndarray): Probability of measuring each value
+    '''
+    values, amplitudes = decodeState(state, n, register+1, tol)
+    values, inverse    = np.unique(values[:, register], return_inverse=True)
+
+    return values, np.bincount(inverse, weights=np.abs(amplitudes)**2)
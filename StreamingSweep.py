@@ -0,0 +1,253 @@
+
+import json
+import os
+import numpy as np
+from typing import Iterator
+
+from Variants import evaluate
+from Sweep import ErrorStats
+
+
+class StreamingStats:
+    '''
+    Running statistics of absolute errors, memory use does not depend on 
+    the number of inputs. Quantiles come from a histogram with log spaced 
+    bins (BINS_PER_DECADE per decade between 10^MIN_EXPONENT and 
+    10^MAX_EXPONENT), so they are accurate to about 4% relative error.
+
+    n_bits    (int): Number of bits used to describe t
+    variant   (str): Key into Variants.VARIANTS
+    position  (int): Offset of the next input to evaluate, used to resume
+    count     (int): Number of errors seen
+    total   (float): Sum of the errors
+    maxError (float): Largest error
+    argmax    (int): Input with the largest error
+    zeros     (int): Number of errors that are exactly zero
+    histogram (np.ndarray): Counts of the nonzero errors per bin
+    '''
+    MIN_EXPONENT:    int = -16
+    MAX_EXPONENT:    int = 1
+    BINS_PER_DECADE: int = 64
+
+    def __init__(self, n_bits: int, variant: str = "modulo"):
+        self.n_bits    = n_bits
+        self.variant   = variant
+        self.position  = 0
+        self.count     = 0
+        self.total     = 0.0
+        self.maxError  = -np.inf
+        self.argmax    = 0
+        self.zeros     = 0
+        self.histogram = np.zeros(
+            (self.MAX_EXPONENT-self.MIN_EXPONENT)*self.BINS_PER_DECADE, 
+            dtype=np.int64
+        )
+
+    def update(self, test: np.ndarray, errors: np.ndarray):
+        '''
+        Adds a chunk of inputs and their absolute errors.
+        '''
+        if len(errors) == 0:
+            return
+
+        self.count += len(errors)
+        self.total += float(np.sum(errors))
+
+        i = int(np.argmax(errors))
+        if errors[i] > self.maxError:
+            self.maxError, self.argmax = float(errors[i]), int(test[i])
+
+        nonzero     = errors[errors > 0]
+        self.zeros += len(errors)-len(nonzero)
+        bins = np.floor(
+            (np.log10(nonzero)-self.MIN_EXPONENT)*self.BINS_PER_DECADE
+        ).astype(np.int64)
+        self.histogram += np.bincount(
+            np.clip(bins, 0, len(self.histogram)-1), 
+            minlength=len(self.histogram)
+        )
+
+    def merge(self, other: "StreamingStats"):
+        '''
+        Adds the statistics of another (disjoint) part of the inputs.
+        '''
+        self.count += other.count
+        self.total += other.total
+        self.zeros += other.zeros
+        self.histogram += other.histogram
+        if other.maxError > self.maxError:
+            self.maxError, self.argmax = other.maxError, other.argmax
+
+    @property
+    def mean(self) -> float:
+        '''
+        Mean of the errors, nan when no error has been seen yet.
+        '''
+        if self.count == 0:
+            return float("nan")
+        return self.total/self.count
+
+    def quantile(self, q: float) -> float:
+        '''
+        Approximate q quantile of the errors, q in [0, 1], nan when no error
+        has been seen yet.
+        '''
+        if self.count == 0:
+            return float("nan")
+
+        rank = q*(self.count-1)
+        if rank < self.zeros:
+            return 0.0
+
+        cumulative = np.cumsum(self.histogram)
+        b          = int(np.searchsorted(cumulative, rank-self.zeros, "right"))
+        below      = cumulative[b]-self.histogram[b]
+        fraction   = (rank-self.zeros-below+0.5)/self.histogram[b]
+        exponent   = self.MIN_EXPONENT + (b+fraction)/self.BINS_PER_DECADE
+
+        return float(min(10**exponent, self.maxError))
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def summary(self) -> ErrorStats:
+        '''
+        Statistics in the same form as Sweep.sweep returns them.
+        '''
+        return ErrorStats(
+            self.n_bits, self.count, self.maxError, self.argmax, self.mean, 
+            self.median,
+        )
+
+    def toDict(self) -> dict:
+        state = dict(vars(self))
+        state["histogram"] = self.histogram.tolist()
+        return state
+
+    @classmethod
+    def fromDict(cls, state: dict) -> "StreamingStats":
+        stats = cls(state["n_bits"], state["variant"])
+        for key, value in state.items():
+            setattr(stats, key, value)
+        stats.histogram = np.array(state["histogram"], dtype=np.int64)
+        return stats
+
+    def save(self, path: str):
+        '''
+        Writes the state to a JSON file, replacing it atomically.
+        '''
+        with open(path + ".partial", "w") as file:
+            json.dump(self.toDict(), file)
+        os.replace(path + ".partial", path)
+
+    @classmethod
+    def load(cls, path: str) -> "StreamingStats":
+        with open(path) as file:
+            return cls.fromDict(json.load(file))
+
+
+def streamInputs(
+        n_bits: int, chunk: int = 1<<18, start: int = 0
+    ) -> Iterator[np.ndarray]:
+    '''
+    Every integer in [-(1<<n_bits), 1<<n_bits], chunk at a time, starting
+    at offset start.
+    '''
+    size = (2<<n_bits)+1
+    for offset in range(start, size, chunk):
+        yield np.arange(
+            offset, min(offset+chunk, size), dtype=np.int64
+        ) - (1<<n_bits)
+
+
+def streamingSweep(
+        n_bits: int, variant: str = "modulo", chunk: int = 1<<18,
+        checkpoint: str = None, checkpointEvery: int = 64,
+    ) -> StreamingStats:
+    '''
+    Exhaustive error statistics for one bit width in constant memory. With
+    a checkpoint file the state is saved every checkpointEvery chunks and
+    an interrupted sweep resumes from the last save.
+
+    n_bits          (int): Number of bits used to describe t
+    variant         (str): Key into Variants.VARIANTS
+    chunk           (int): Number of inputs evaluated at once
+    checkpoint      (str): JSON file holding the partial state
+    checkpointEvery (int): Chunks between saves
+
+    return (StreamingStats): The statistics
+    '''
+    if checkpoint is not None and os.path.exists(checkpoint):
+        stats = StreamingStats.load(checkpoint)
+        if (stats.n_bits, stats.variant) != (n_bits, variant):
+            raise ValueError(f"{checkpoint} belongs to a different sweep")
+    else:
+        stats = StreamingStats(n_bits, variant)
+
+    for k, test in enumerate(streamInputs(n_bits, chunk, stats.position)):
+        expected  = np.arcsin(test/(2**n_bits))
+        predicted = evaluate(test, n_bits, variant)
+        stats.update(test, np.abs(expected-predicted))
+        stats.position += len(test)
+
+        if checkpoint is not None and (k+1)%checkpointEvery == 0:
+            stats.save(checkpoint)
+
+    if checkpoint is not None:
+        stats.save(checkpoint)
+
+    return stats
+
+
+def checkStreamingStats(n_bits: int = 8, chunk: int = 100) -> int:
+    '''
+    Checks an empty StreamingStats (fresh, resumed at position 0, or merged
+    from empty chunks) summarizes to nan instead of failing, and that a 
+    streaming sweep agrees with Sweep.summarize on the same inputs.
+
+    n_bits (int): Number of bits used to describe t
+    chunk  (int): Number of inputs per streamed chunk
+
+    return (int): Number of failed checks
+    '''
+    from Sweep import summarize, sweepInputs
+
+    empty = StreamingStats(n_bits)
+    empty.update(np.zeros(0, dtype=np.int64), np.zeros(0))
+    empty.merge(StreamingStats(n_bits))
+    resumed = StreamingStats.fromDict(StreamingStats(n_bits).toDict())
+
+    failures = 0
+    for stats in (StreamingStats(n_bits), empty, resumed):
+        summary   = stats.summary()
+        failures += not (np.isnan(summary.mean) and np.isnan(summary.median))
+        failures += summary.count != 0
+
+    test     = sweepInputs(n_bits)
+    expected = summarize(
+        n_bits, test, np.abs(np.arcsin(test/(2**n_bits))-evaluate(test, n_bits))
+    )
+    streamed  = streamingSweep(n_bits, chunk=chunk).summary()
+    failures += (streamed.count, streamed.maxError, streamed.argmax) != (
+        expected.count, expected.maxError, expected.argmax
+    )
+    failures += not np.isclose(streamed.mean, expected.mean)
+    failures += abs(streamed.median-expected.median) > 0.05*expected.median
+
+    return failures
+
+
+def main():
+    n_bits = 16
+    stats  = streamingSweep(n_bits, chunk=1<<14)
+
+    print(f"{stats.maxError       = :.6f}")
+    print(f"{stats.argmax         = }")
+    print(f"{stats.mean           = :.6f}")
+    print(f"{stats.median         = :.6f}")
+    print(f"{stats.quantile(0.99) = :.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Sequence
+
+from Variants import evaluate
+
+
+class ErrorStats(NamedTuple):
+    '''
+    Absolute error of an arcsin variant against np.arcsin over a set of 
+    inputs.
+
+    n_bits   (int): Number of bits used to describe t
+    count    (int): Number of inputs
+    maxError (float): Largest absolute error
+    argmax   (int): Input with the largest absolute error
+    mean     (float): Mean absolute error
+    median   (float): Median absolute error
+    '''
+    n_bits:   int
+    count:    int
+    maxError: float
+    argmax:   int
+    mean:     float
+    median:   float
+
+
+def sweepInputs(
+        n_bits: int, num: int = None, start: int = 0, stop: int = None
+    ) -> np.ndarray:
+    '''
+    Inputs of a sweep, every integer in [-(1<<n_bits), 1<<n_bits], or num 
+    evenly spaced ones like the main() functions use (np.linspace rounded 
+    down). Only the inputs with index in [start, stop) are built, so a 
+    chunk costs nothing more than its own length.
+
+    n_bits (int): Number of bits used to describe t
+    num    (int): Number of evenly spaced inputs, all inputs when None
+    start  (int): Index of the first input returned
+    stop   (int): Index after the last input returned, the end by default
+
+    return (np.ndarray): int64 inputs
+    '''
+    low, high = -(1<<n_bits), 1<<n_bits
+    count     = high-low+1 if num is None else num
+    stop      = count if stop is None else min(stop, count)
+    index     = np.arange(start, stop, dtype=np.int64)
+
+    if num is None:
+        return index+low
+    if num == 1:
+        return np.full(len(index), low, dtype=np.int64)
+
+    #Same arithmetic as np.linspace, which also sets the endpoint exactly
+    values = np.floor(index*((high-low)/(num-1)) + low)
+    values[index == num-1] = high
+    return values.astype(np.int64)
+
+
+def _absoluteErrors(
+        n_bits: int, variant: str, test: np.ndarray
+    ) -> np.ndarray:
+    expected  = np.arcsin(test/(2**n_bits))
+    predicted = evaluate(test, n_bits, variant)
+    return np.abs(expected-predicted)
+
+
+def _runChunk(
+        n_bits: int, variant: str, num: int, start: int, stop: int
+    ) -> tuple[int, int, np.ndarray]:
+    test = sweepInputs(n_bits, num, start, stop)
+    return n_bits, start, _absoluteErrors(n_bits, variant, test)
+
+
+def summarize(n_bits: int, test: np.ndarray, errors: np.ndarray) -> ErrorStats:
+    '''
+    Summary statistics of absolute errors, as printed by the main() functions.
+    '''
+    return ErrorStats(
+        n_bits, len(test), float(np.max(errors)), int(test[np.argmax(errors)]),
+        float(np.mean(errors)), float(np.median(errors)),
+    )
+
+
+def sweep(
+        n_bits: Sequence[int], variant: str = "modulo", num: int = None,
+        chunk: int = 1<<15, processes: int = None,
+    ) -> dict[int, ErrorStats]:
+    '''
+    Error statistics for several bit widths. The inputs of every bit width 
+    are split in chunks which are evaluated on a process pool, the per chunk
+    errors are then merged.
+
+    n_bits (Sequence[int]): Bit widths to sweep
+    variant          (str): Key into Variants.VARIANTS
+    num              (int): Evenly spaced inputs per bit width, all inputs
+        when None
+    chunk            (int): Number of inputs per work unit
+    processes        (int): Pool size, defaults to every core
+
+    return (dict[int, ErrorStats]): Statistics for every bit width
+    '''
+    tests  = {n: sweepInputs(n, num) for n in n_bits}
+    errors = {n: np.empty(len(test)) for n, test in tests.items()}
+
+    # Interleave the bit widths so the pool stays busy until the end
+    units = sorted(
+        ((n, start, min(start+chunk, len(test)))
+         for n, test in tests.items() for start in range(0, len(test), chunk)),
+        key=lambda unit: unit[1]
+    )
+
+    with ProcessPoolExecutor(processes or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_runChunk, n, variant, num, start, stop)
+            for n, start, stop in units
+        ]
+        for future in as_completed(futures):
+            n, start, chunkErrors = future.result()
+            errors[n][start:start+len(chunkErrors)] = chunkErrors
+
+    return {n: summarize(n, tests[n], errors[n]) for n in n_bits}
+
+
+def main():
+    for n_bits, count, maxError, argmax, mean, median in sweep(
+            range(10, 17)
+        ).values():
+        print(
+            f"{n_bits=:>3} | {maxError=:.6f} | {argmax=:>7}"
+            +f" | {mean=:.6f} | {median=:.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
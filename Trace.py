@@ -0,0 +1,77 @@
+
+import numpy as np
+from typing import Callable
+
+# A trace hook is called once per CORDIC iteration, after the decision bit
+# is computed and before the rotation, as
+#     hook(i, x, y, t, aux_1, aux_2, theta, d)
+# The CORDIC loops skip it entirely when no hook is given.
+TraceHook = Callable[..., None]
+
+
+class CORDICTrace:
+    '''
+    Trace hook recording every iteration into preallocated arrays of shape
+    (iterations, batch), for offline analysis with save().
+
+    n_bits (int): Number of bits used to describe t, the loops run n_bits+1
+        iterations
+    batch  (int): Number of inputs evaluated together
+    dtype  (np.dtype): Type of the x, y, t and aux registers, int64 for the
+        fixed point loops and float64 for asinCORDICCheating
+    '''
+    REGISTERS: tuple[str, ...] = ("x", "y", "t", "aux_1", "aux_2")
+
+    def __init__(self, n_bits: int, batch: int = 1, dtype=np.int64):
+        shape = (n_bits+1, batch)
+
+        self.iterations = 0
+        self.registers  = {
+            name: np.zeros(shape, dtype=dtype) for name in self.REGISTERS
+        }
+        self.theta      = np.zeros(shape)
+        self.d          = np.zeros(shape, dtype=np.int8)
+
+    def __call__(self, i, x, y, t, aux_1, aux_2, theta, d):
+        row = i-1
+        for name, value in zip(self.REGISTERS, (x, y, t, aux_1, aux_2)):
+            self.registers[name][row] = value
+        self.theta[row] = theta
+        self.d[row]     = d
+        self.iterations = max(self.iterations, i)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        '''
+        The recorded iterations, keyed by register name, theta and d.
+        '''
+        arrays = {
+            name: values[:self.iterations]
+            for name, values in self.registers.items()
+        }
+        arrays["theta"] = self.theta[:self.iterations]
+        arrays["d"]     = self.d[:self.iterations]
+
+        return arrays
+
+    def save(self, path: str):
+        '''
+        Writes the recorded iterations to a .npz file.
+        '''
+        np.savez(path, **self.arrays())
+
+
+def printTrace(t: int, n_bits: int) -> TraceHook:
+    '''
+    Trace hook printing every iteration, next to the decision that the 
+    exact angle arcsin(t/2^n_bits) would give (truD).
+    '''
+    exact = np.arcsin(t/(1<<n_bits))
+
+    def hook(i, x, y, t, aux_1, aux_2, theta, d):
+        print(f"|x{i-1}={x:.2f}\t|y{i-1}={y:.2f}"
+              +f"\t|t{i-1}={t:.2f}\t|theta{i-1}={theta:.2f}"
+              +f"\t|d{i}={d}"
+              +f"\t|truD{i}={int(1 if theta <= exact else -1)}"
+        )
+
+    return hook
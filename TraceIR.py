@@ -0,0 +1,251 @@
+
+import numpy as np
+from typing import NamedTuple
+
+from Schedule import arctanTable, multSchedule
+
+# Register indices
+X, Y, T, AUX_1, AUX_2 = range(5)
+REGISTER_NAMES: tuple[str, ...] = ("x", "y", "t", "aux_1", "aux_2")
+
+# Operation kinds
+ADD, DECIDE, SWAP, THETA = range(4)
+
+
+class Op(NamedTuple):
+    '''
+    One typed register operation.
+
+    kind      (int): ADD, DECIDE, SWAP or THETA
+    dst       (int): ADD/SWAP: register written to
+    src       (int): ADD/SWAP: register read from
+    shift     (int): ADD: right bitshift of src, THETA: iteration index
+    negative (bool): ADD: subtracts when true
+
+    ADD    : dst += ±(src>>shift) modulo 2^n
+    DECIDE : stores the decision bit computed from x, y and t
+    SWAP   : swaps dst and src when the decision bit is set
+    THETA  : theta += 2*(∓1)*arctan(2^(-shift)) depending on the decision bit
+    '''
+    kind:     int
+    dst:      int = 0
+    src:      int = 0
+    shift:    int = 0
+    negative: bool = False
+
+
+class Program(NamedTuple):
+    '''
+    A flat list of operations together with the register size it runs on.
+
+    n    (int): Number of bits per register
+    ops  (tuple[Op, ...]): The operations, executed in order
+    '''
+    n:   int
+    ops: tuple[Op, ...]
+
+
+def traceAdd(
+        dst: int, src: int, shift: int, negative: bool = False
+    ) -> list[Op]:
+    '''
+    Trace of ShiftAdd.add, dst += ±(src>>shift).
+    '''
+    return [Op(ADD, dst, src, shift, negative)]
+
+
+def traceMult(
+        n: int, m: int, x: int = X, aux_1: int = AUX_1, aux_2: int = AUX_2
+    ) -> list[Op]:
+    '''
+    Trace of Mult.multImproved in modulo mode, x *= 1+2^(-m).
+
+    n     (int): Number of bits representing x
+    m     (int): x is multiplied by 1+2^(-m)
+    x     (int): Register being multiplied
+    aux_1 (int): First auxiliary register
+    aux_2 (int): Second auxiliary register
+
+    return (list[Op]): The operations
+    '''
+    schedule = multSchedule(n, m)
+    ops = [
+        Op(ADD, aux_2, x, 0), Op(ADD, x, aux_2, m), Op(ADD, aux_1, x, 0),
+    ]
+    for step in schedule.forward:
+        if step.intoAux:
+            ops.append(Op(ADD, aux_1, x, step.shift, step.negative))
+        else:
+            ops.append(Op(ADD, x, aux_1, step.shift, step.negative))
+
+    ops.append(Op(ADD, aux_2, aux_1, 0, True))
+
+    for step in schedule.backward:
+        if step.intoAux:
+            ops.append(Op(ADD, aux_1, x, step.shift, step.negative))
+        else:
+            ops.append(Op(ADD, x, aux_1, step.shift, step.negative))
+
+    ops.append(Op(ADD, aux_1, x, 0, True))
+
+    return ops
+
+
+def traceCORDIC(n_bits: int) -> Program:
+    '''
+    Trace of one run of FullPrototypeClassical.qasinModuloCORDIC.
+    The decision bits only select between the two branches of each SWAP, 
+    so the operation list is the same for every input.
+
+    n_bits (int): Number of bits used to describe t
+
+    return (Program): The CORDIC program on n_bits+2 bit registers
+    '''
+    n   = n_bits+2
+    ops = []
+    for i in range(1, n):
+        ops.append(Op(DECIDE))
+        ops.append(Op(SWAP, X, Y))
+        for _ in range(2):
+            ops.append(Op(ADD, X, Y, i, True))
+            ops.extend(traceMult(n, 2*i, Y))
+            ops.append(Op(ADD, Y, X, i, False))
+        ops.append(Op(SWAP, X, Y))
+        ops.append(Op(THETA, shift=i))
+        ops.extend(traceMult(n, 2*i, T))
+
+    return Program(n, tuple(ops))
+
+
+def execute(program: Program, registers: list[int]) -> float:
+    '''
+    Runs a program on python int registers, the registers are updated in 
+    place.
+
+    program        (Program): Program to run
+    registers (list[int]): Values of x, y, t, aux_1 and aux_2
+
+    return (float): The accumulated theta
+    '''
+    n       = program.n
+    N       = 1<<n
+    sign    = 1<<(n-1)
+    atan    = arctanTable(n)
+    theta   = 0
+    d       = False
+
+    for kind, dst, src, shift, negative in program.ops:
+        if kind == ADD:
+            y = registers[src]%N
+            if y&sign:
+                y -= N
+            y = (y>>min(shift, n))%N
+            if negative:
+                registers[dst] = (registers[dst]-y)%N
+            else:
+                registers[dst] = (registers[dst]+y)%N
+        elif kind == DECIDE:
+            xNeg = (registers[X]&sign) != 0
+            diff = registers[T] - (0 if xNeg else registers[Y])
+            d    = xNeg != ((diff&sign) != 0)
+        elif kind == SWAP:
+            if d:
+                registers[dst], registers[src] = registers[src], registers[dst]
+        else:
+            theta += 2*(-1 if d else 1)*atan[shift]
+
+    return theta
+
+
+def executeBatch(program: Program, registers: np.ndarray) -> np.ndarray:
+    '''
+    Runs a program on a batch of int64 registers, the registers are updated
+    in place.
+
+    program         (Program): Program to run, program.n must be at most 62
+    registers    (np.ndarray): Array of shape (5, batch) holding x, y, t, 
+        aux_1 and aux_2
+
+    return (np.ndarray): The accumulated theta for every element of the batch
+    '''
+    n       = program.n
+    N       = 1<<n
+    sign    = 1<<(n-1)
+    atan    = arctanTable(n)
+    theta   = np.zeros(registers.shape[1:])
+    d       = np.zeros(registers.shape[1:], dtype=bool)
+
+    for kind, dst, src, shift, negative in program.ops:
+        if kind == ADD:
+            y = registers[src] - ((registers[src]&sign) != 0)*N
+            y = (y>>min(shift, n))%N
+            if negative:
+                registers[dst] -= y
+            else:
+                registers[dst] += y
+            registers[dst] %= N
+        elif kind == DECIDE:
+            xNeg = (registers[X]&sign) != 0
+            diff = registers[T] - np.where(xNeg, 0, registers[Y])
+            d    = xNeg != ((diff&sign) != 0)
+        elif kind == SWAP:
+            registers[[dst, src]] = np.where(
+                d, registers[[src, dst]], registers[[dst, src]]
+            )
+        else:
+            theta += 2*np.where(d, -1, 1)*atan[shift]
+
+    return theta
+
+
+def replay(program: Program, t: int) -> float:
+    '''
+    Replays a CORDIC program from traceCORDIC for one input.
+
+    program (Program): Program from traceCORDIC
+    t           (int): Input angle in fixed point notation
+
+    return (float): Approximation of arcsin(t/(2^n_bits))
+    '''
+    return execute(program, [(1<<(program.n-2))-1, 0, t, 0, 0])
+
+
+def replayBatch(program: Program, t: np.ndarray) -> np.ndarray:
+    '''
+    Replays a CORDIC program from traceCORDIC for an array of inputs.
+
+    program   (Program): Program from traceCORDIC
+    t      (np.ndarray): Input angles in fixed point notation
+
+    return (np.ndarray): Approximations of arcsin(t/(2^n_bits))
+    '''
+    t = np.asarray(t, dtype=np.int64)
+    registers = np.zeros((5,)+t.shape, dtype=np.int64)
+    registers[X] = (1<<(program.n-2))-1
+    registers[T] = t%(1<<program.n)
+
+    return executeBatch(program, registers)
+
+
+def main():
+    from Mult import multImproved
+    from FullPrototypeClassical import qasinModuloCORDIC
+
+    n_bits  = 8
+    program = traceCORDIC(n_bits)
+    test    = np.arange(-(1<<n_bits), (1<<n_bits)+1)
+
+    print(f"{n_bits=} | {len(program.ops)=}")
+    expected = np.array([qasinModuloCORDIC(int(t), n_bits) for t in test])
+    scalar   = [replay(program, int(t)) for t in test]
+    print(f"{np.array_equal(expected, scalar) = }")
+    print(f"{np.array_equal(expected, replayBatch(program, test)) = }")
+
+    n, m = 8, 2
+    registers = [181, 3, 7]
+    execute(Program(n, tuple(traceMult(n, m, 0, 1, 2))), registers)
+    print(f"{multImproved(181, 3, 7, n, m, modulo=True)=} | {registers=}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+
+import numpy as np
+
+from FullPrototypeClassical import qasinModuloCORDICBatch
+
+
+def _scalarVariant(moduleName: str, functionName: str):
+    '''
+    Wraps one of the scalar arcsin implementations so it can be evaluated 
+    on an array of inputs. The module is only imported when first used.
+
+    moduleName   (str): Module holding the implementation
+    functionName (str): Name of the scalar function (t, n_bits) -> theta
+
+    return (Callable[[np.ndarray, int], np.ndarray]): Batched function
+    '''
+    def variant(t: np.ndarray, n_bits: int) -> np.ndarray:
+        function = getattr(__import__(moduleName), functionName)
+        return np.array(
+            [function(int(value), n_bits) for value in np.ravel(t)], 
+            dtype=np.float64
+        ).reshape(np.shape(t))
+
+    variant.__name__ = f"{moduleName}.{functionName}"
+    return variant
+
+
+def _batchVariant(moduleName: str, functionName: str):
+    '''
+    Like _scalarVariant for implementations that already take an array of
+    inputs, the module is only imported when first used.
+    '''
+    def variant(t: np.ndarray, n_bits: int) -> np.ndarray:
+        return getattr(__import__(moduleName), functionName)(t, n_bits)
+
+    variant.__name__ = f"{moduleName}.{functionName}"
+    return variant
+
+
+VARIANTS = {
+    "modulo":           qasinModuloCORDICBatch,
+    "classical-modulo": _scalarVariant("ClassicalQCORDIC", "qasinModuloCORDIC"),
+    "non-modulo":       _scalarVariant("ClassicalQCORDIC", "qasinCORDIC"),
+    "classical":        _scalarVariant("ClassicalQCORDIC", "asinCORDICClassical"),
+    "cheating":         _batchVariant("ClassicalQCORDIC", "asinCORDICCheatingBatch"),
+}
+
+
+def evaluate(t: np.ndarray, n_bits: int, variant: str = "modulo") -> np.ndarray:
+    '''
+    Evaluates one of the arcsin CORDIC variants on an array of inputs.
+
+    t    (np.ndarray): Input angles in fixed point notation
+    n_bits      (int): Number of bits used to describe t
+    variant     (str): Key into VARIANTS
+
+    return (np.ndarray): Approximations of arcsin(t/(2^n_bits))
+    '''
+    if variant not in VARIANTS:
+        raise ValueError(
+            f"Unknown variant {variant!r}, expected one of {list(VARIANTS)}"
+        )
+    return VARIANTS[variant](np.asarray(t, dtype=np.int64), n_bits)
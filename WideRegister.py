@@ -0,0 +1,212 @@
+
+import numpy as np
+from typing import Sequence
+
+from Schedule import arctanTable, multSchedule
+
+LIMB_BITS: int = 64
+LIMB_MASK: int = (1<<LIMB_BITS)-1
+
+
+def limbCount(n_bits: int) -> int:
+    '''
+    Number of uint64 limbs needed to hold an n_bits register.
+    '''
+    return -(-n_bits//LIMB_BITS)
+
+
+def _topMask(n_bits: int) -> np.uint64:
+    return np.uint64(LIMB_MASK >> (LIMB_BITS*limbCount(n_bits)-n_bits))
+
+
+def fromInts(values: Sequence[int], n_bits: int) -> np.ndarray:
+    '''
+    Converts integers to a batch of n_bits registers (two's complement).
+
+    values (Sequence[int] | np.ndarray): Python ints of any size, or an 
+        int64 array
+    n_bits (int): Number of bits per register
+
+    return (np.ndarray): uint64 array of shape (limbs, batch), least 
+        significant limb first
+    '''
+    L = limbCount(n_bits)
+    if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+        values = values.astype(np.int64).ravel()
+        fill   = np.where(values < 0, np.uint64(LIMB_MASK), np.uint64(0))
+        x      = np.empty((L, len(values)), dtype=np.uint64)
+        x[0]   = values.astype(np.uint64)
+        x[1:]  = fill
+    else:
+        values = [int(v) % (1<<n_bits) for v in values]
+        x = np.array(
+            [[(v >> (LIMB_BITS*k)) & LIMB_MASK for v in values]
+             for k in range(L)],
+            dtype=np.uint64
+        ).reshape(L, len(values))
+    x[-1] &= _topMask(n_bits)
+
+    return x
+
+
+def toInts(x: np.ndarray, n_bits: int, signed: bool = False) -> list[int]:
+    '''
+    Converts a batch of registers back to Python ints.
+
+    x  (np.ndarray): Registers from fromInts
+    n_bits    (int): Number of bits per register
+    signed   (bool): Reads the registers as two's complement when true
+
+    return (list[int]): The values
+    '''
+    values = [0]*x.shape[1]
+    for k in range(x.shape[0]-1, -1, -1):
+        values = [(v << LIMB_BITS) | int(limb) for v, limb in zip(values, x[k])]
+    if signed:
+        values = [v - (1<<n_bits) if v >> (n_bits-1) else v for v in values]
+
+    return values
+
+
+def isnegWide(x: np.ndarray, n_bits: int) -> np.ndarray:
+    '''
+    True where the register is negative in two's complement.
+    '''
+    bit = (n_bits-1) % LIMB_BITS
+    return ((x[(n_bits-1)//LIMB_BITS] >> np.uint64(bit)) & np.uint64(1)) == 1
+
+
+def _addLimbs(
+        x: np.ndarray, y: np.ndarray, n_bits: int, carry: int = 0
+    ) -> np.ndarray:
+    out   = np.empty_like(x)
+    carry = np.full(x.shape[1:], carry, dtype=np.uint64)
+    for k in range(x.shape[0]):
+        s      = x[k] + y[k]
+        out[k] = s + carry
+        carry  = ((s < x[k]) | (out[k] < s)).astype(np.uint64)
+    out[-1] &= _topMask(n_bits)
+
+    return out
+
+
+def bitshiftWide(x: np.ndarray, shift: int, n_bits: int) -> np.ndarray:
+    '''
+    Right bitshifting in two's complement of a batch of wide registers.
+    Note: The leftmost bit is copied leftwards, i.e., 1010>>1 == 1101.
+
+    x  (np.ndarray): Registers from fromInts
+    shift     (int): How far the values are shifted right, non-negative
+    n_bits    (int): Number of bits per register
+
+    return (np.ndarray): Right bitshifted x
+    '''
+    L     = x.shape[0]
+    shift = min(shift, n_bits)
+    fill  = np.where(isnegWide(x, n_bits), np.uint64(LIMB_MASK), np.uint64(0))
+
+    # Sign extend the top limb so the shifted in bits are sign bits
+    top   = x[-1] | (fill & ~_topMask(n_bits))
+    limbs = list(x[:-1]) + [top] + [fill]*(shift//LIMB_BITS + 1)
+    q, r  = divmod(shift, LIMB_BITS)
+
+    out = np.empty_like(x)
+    for k in range(L):
+        if r == 0:
+            out[k] = limbs[k+q]
+        else:
+            out[k] = (limbs[k+q] >> np.uint64(r)) \
+                | (limbs[k+q+1] << np.uint64(LIMB_BITS-r))
+    out[-1] &= _topMask(n_bits)
+
+    return out
+
+
+def addWide(
+        x: np.ndarray, y: np.ndarray, shift: int, n: int, 
+        negativeY: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Wide register version of add, bitshifts y in two's complement and adds
+    result to x modulo 2^n.
+
+    x  (np.ndarray): Registers to be added to
+    y  (np.ndarray): Registers adding into x
+    shift     (int): Bitshift applied to y before addition
+    n         (int): Number of bits
+    negativeY (bool): Subtracts y if true
+    '''
+    shifted = bitshiftWide(y, shift, n)
+    if negativeY:
+        return _addLimbs(x, ~shifted, n, carry=1), y
+    return _addLimbs(x, shifted, n), y
+
+
+def multWide(
+        x: np.ndarray, aux_1: np.ndarray, aux_2: np.ndarray, n: int, m: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Wide register version of FullPrototypeClassical.mult, x *= 1+2^(-m).
+    '''
+    aux_2, x = addWide(aux_2, x, 0, n)
+    x, aux_2 = addWide(x, aux_2, m, n)
+    aux_1, x = addWide(aux_1, x, 0, n)
+
+    schedule = multSchedule(n, m)
+    for step in schedule.forward:
+        if step.intoAux:
+            aux_1, x = addWide(aux_1, x, step.shift, n, step.negative)
+        else:
+            x, aux_1 = addWide(x, aux_1, step.shift, n, step.negative)
+
+    aux_2, aux_1 = addWide(aux_2, aux_1, 0, n, negativeY=True)
+
+    for step in schedule.backward:
+        if step.intoAux:
+            aux_1, x = addWide(aux_1, x, step.shift, n, step.negative)
+        else:
+            x, aux_1 = addWide(x, aux_1, step.shift, n, step.negative)
+
+    aux_1, x = addWide(aux_1, x, 0, n, negativeY=True)
+
+    return x, aux_1, aux_2
+
+
+def qasinModuloCORDICWide(t: Sequence[int], n_bits: int) -> np.ndarray:
+    '''
+    FullPrototypeClassical.qasinModuloCORDIC on multi-limb registers, for 
+    batches of inputs at any precision. Results match the scalar path bit
+    for bit.
+
+    t (Sequence[int] | np.ndarray) [-(1<<n_bits),1<<n_bits]: Input angles
+        written in fixed point notation two's complement
+    n_bits (int): Number of bits used to describe t
+
+    return (np.ndarray): theta_{n_bits+2} for every input
+    '''
+    n       = n_bits+2
+    t_i     = fromInts(t, n)
+    shape   = t_i.shape
+    x_i     = fromInts([(1<<n_bits)-1], n).repeat(shape[1], axis=1)
+    y_i     = np.zeros(shape, dtype=np.uint64)
+    aux_1   = np.zeros(shape, dtype=np.uint64)
+    aux_2   = np.zeros(shape, dtype=np.uint64)
+    theta_i = np.zeros(shape[1])
+    atan    = arctanTable(n)
+
+    for i in range(1, n):
+        xNeg = isnegWide(x_i, n)
+        diff = _addLimbs(t_i, ~np.where(xNeg, np.uint64(0), y_i), n, carry=1)
+        d    = xNeg != isnegWide(diff, n)
+
+        x_i, y_i = np.where(d, y_i, x_i), np.where(d, x_i, y_i)
+        for _ in range(2):
+            x_i, y_i = addWide(x_i, y_i, i, n, negativeY=True)
+            y_i, aux_1, aux_2 = multWide(y_i, aux_1, aux_2, n, 2*i)
+            y_i, x_i = addWide(y_i, x_i, i, n, negativeY=False)
+        x_i, y_i = np.where(d, y_i, x_i), np.where(d, x_i, y_i)
+
+        theta_i += 2*np.where(d, -1, 1)*atan[i]
+        t_i, aux_1, aux_2 = multWide(t_i, aux_1, aux_2, n, 2*i)
+
+    return theta_i
@@ -1,19 +1,7 @@
 
 import numpy as np
-from functools import cache
 
-@cache
-def fib(i:int) -> int: 
-    '''
-    Fibonacci numbers { 1,1,3,5,8,13, ... }
-
-    i (int): Index of Fibonacci number
-
-    return (int): i^th Fibonacci number
-    '''
-    return int(np.round(
-        1/(5**.5) * (((1+5**.5)/2)**(i+1)-((1-5**.5)/2)**(i+1))
-    ))
+from Schedule import multSchedule
 
 def bitshift(x: int, shift: int, n_bits: int) -> int:
     '''
@@ -89,19 +77,20 @@ def originalMult(
     x, aux_2 = add(x, aux_2, m, n=n)
     aux_1, x = add(aux_1, x, 0, n=n)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))):
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=(fib(i)%2==1))
+    schedule = multSchedule(n, m)
+    for step in schedule.forward:
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=(fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_2, aux_1 = add(aux_2, aux_1, 0, n=n, negativeY=True)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))-1, -1, -1):
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=not (fib(i)%2==1))
+    for step in schedule.backward:
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=not (fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_1, x = add(aux_1, x, 0, n, negativeY=True)
 
@@ -130,11 +119,11 @@ def mult(
 
     aux_1, x = add(aux_1, x, 0, n=n)
     
-    for i in range(int(1+2*np.ceil(np.log(n/m)/np.log((1+5**.5))))-1, -1, -1):
-        if i%2 == 0:
-            x, aux_1 = add(x, aux_1, m*fib(i), n, negativeY=not (fib(i)%2==1))
+    for step in multSchedule(n, m).backward:
+        if step.intoAux:
+            aux_1, x = add(aux_1, x, step.shift, n, negativeY=step.negative)
         else:
-            aux_1, x = add(aux_1, x, m*fib(i), n, negativeY=not (fib(i)%2==1))
+            x, aux_1 = add(x, aux_1, step.shift, n, negativeY=step.negative)
 
     aux_1, x = add(aux_1, x, 0, n, negativeY=True)
 